@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import os
 import re
 from dataclasses import dataclass, replace
+from functools import lru_cache
 from pathlib import Path
 
 
 _DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FileParts:
     experience: str
     device_id: str
@@ -62,6 +64,12 @@ def parse_parquet_path(path: Path) -> FileParts:
     Expected: domain=bio_signal/PREMANIP-GRACE__pil-90__clean__2026-01-25.parquet
     Or:       domain=bio_signal/PREMANIP-GRACE__pil-90__aggregated__60s__2026-01-25.parquet
     """
+    return _parse_parquet_path_cached(str(path))
+
+
+@lru_cache(maxsize=4096)
+def _parse_parquet_path_cached(path_str: str) -> FileParts:
+    path = Path(path_str)
     # Extract domain from parent directory
     parent_name = path.parent.name
     if parent_name.startswith("domain="):
@@ -112,4 +120,15 @@ def build_parquet_path(parts: FileParts, output_dir: Path) -> Path:
 
 def list_parquet_files(directory: Path) -> list[Path]:
     """List all parquet files in domain=*/ subdirectories."""
-    return sorted(directory.glob("domain=*/*.parquet"))
+    try:
+        top = os.scandir(directory)
+    except FileNotFoundError:
+        return []
+    result = []
+    with top:
+        for entry in top:
+            if not (entry.name.startswith("domain=") and entry.is_dir()):
+                continue
+            with os.scandir(entry.path) as sub:
+                result.extend(Path(f.path) for f in sub if f.name.endswith(".parquet"))
+    return sorted(result)
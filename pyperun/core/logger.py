@@ -18,6 +18,13 @@ def new_run_id() -> str:
     return os.urandom(4).hex()
 
 
+def _write(entry: dict) -> None:
+    """Append one event to LOG_PATH as a JSON line."""
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with jsonlines.open(LOG_PATH, mode="a") as writer:
+        writer.write(entry)
+
+
 def log_event(
     treatment: str,
     status: str,
@@ -52,6 +59,4 @@ def log_event(
         entry["duration_ms"] = round(duration_ms, 1)
     if error is not None:
         entry["error"] = error
-    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with jsonlines.open(LOG_PATH, mode="a") as writer:
-        writer.write(entry)
+    _write(entry)
@@ -2,16 +2,25 @@ from __future__ import annotations
 
 import re
 from datetime import datetime, date, timezone, timedelta
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 
 _DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+_FAST_ISO_Z_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z")
 
 
 def parse_iso_utc(s: str) -> datetime:
     """Parse an ISO 8601 string to a timezone-aware UTC datetime."""
+    # Fast path for the common second-precision 'Z' form
+    m = _FAST_ISO_Z_RE.fullmatch(s)
+    if m:
+        return datetime(*map(int, m.groups()), tzinfo=timezone.utc)
     # Python 3.10 doesn't support 'Z' suffix in fromisoformat
     dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
     if dt.tzinfo is None:
@@ -19,6 +28,7 @@ def parse_iso_utc(s: str) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+@lru_cache(maxsize=2**16)
 def extract_date_from_filename(name: str) -> date | None:
     """Extract the first YYYY-MM-DD date found in a filename."""
     m = _DATE_RE.search(name)
@@ -36,20 +46,45 @@ def filter_files_by_date_range(
 
     Files without an embedded date are always excluded.
     """
-    date_from = time_from.date() if time_from else None
-    date_to = time_to.date() if time_to else None
+    found = [m.group(1) if m else "NaT" for m in map(_DATE_RE.search, (f.name for f in files))]
+    dates = np.array(found, dtype="datetime64[D]")
 
-    result = []
-    for f in files:
-        d = extract_date_from_filename(f.name)
-        if d is None:
-            continue
-        if date_from and d < date_from:
-            continue
-        if date_to and d > date_to:
+    mask = ~np.isnat(dates)
+    if time_from:
+        mask &= dates >= np.datetime64(time_from.date(), "D")
+    if time_to:
+        mask &= dates <= np.datetime64(time_to.date(), "D")
+    return [files[i] for i in np.flatnonzero(mask)]
+
+
+def _read_max_timestamp(path: Path) -> datetime | None:
+    """Return the max value across the timestamp columns of one parquet file.
+
+    Reads the row-group min/max statistics from the footer; a column is only
+    decoded when some non-empty row group has no statistics for it.
+    """
+    pf = pq.ParquetFile(path)
+    meta = pf.metadata
+    leaf_index = {pf.schema.column(i).path: i for i in range(meta.num_columns)}
+    last_ts = None
+    for field in pf.schema_arrow:
+        if not pa.types.is_timestamp(field.type) or field.name not in leaf_index:
             continue
-        result.append(f)
-    return result
+        j = leaf_index[field.name]
+        col_max = None
+        for rg in range(meta.num_row_groups):
+            rg_meta = meta.row_group(rg)
+            if rg_meta.num_rows == 0:
+                continue
+            stats = rg_meta.column(j).statistics
+            if stats is None or not stats.has_min_max:
+                col_max = pc.max(pq.read_table(path, columns=[field.name]).column(0)).as_py()
+                break
+            if col_max is None or stats.max > col_max:
+                col_max = stats.max
+        if col_max is not None and (last_ts is None or col_max > last_ts):
+            last_ts = col_max
+    return last_ts
 
 
 def compute_last_timestamp(directory: Path) -> datetime | None:
@@ -63,16 +98,9 @@ def compute_last_timestamp(directory: Path) -> datetime | None:
     last_ts: datetime | None = None
 
     for p in parquets:
-        table = pq.read_table(p)
-        for col_name in table.column_names:
-            col = table.column(col_name)
-            if hasattr(col.type, "tz") or str(col.type).startswith("timestamp"):
-                series = col.to_pandas()
-                if series.empty:
-                    continue
-                ts_max = series.max()
-                if last_ts is None or ts_max > last_ts:
-                    last_ts = ts_max
+        ts_max = _read_max_timestamp(p)
+        if ts_max is not None and (last_ts is None or ts_max > last_ts):
+            last_ts = ts_max
 
     if last_ts is not None:
         return last_ts
@@ -2,6 +2,7 @@ from collections import defaultdict
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.parquet as pq
 
 from pyperun.core.filename import list_parquet_files, parse_parquet_path
 
@@ -45,10 +46,14 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
     total_files = sum(len(v) for v in by_device.values())
     print(f"  [exportnour] Found {total_files} files, {len(by_device)} devices (domain={domain}, agg={aggregation})")
 
+    # Only decode ts and the exported columns (projection pushdown)
+    wanted = ["ts"] + list(col_names)
+
     for device_id, files in sorted(by_device.items()):
         frames = []
         for pf in files:
-            df = pd.read_parquet(pf)
+            file_cols = set(pq.read_schema(pf).names)
+            df = pd.read_parquet(pf, columns=[c for c in wanted if c in file_cols])
             if not df.empty:
                 frames.append(df)
 
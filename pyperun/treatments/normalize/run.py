@@ -8,6 +8,7 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 
 
 PARAMS_FILE = "normalize_params.json"
@@ -104,9 +105,15 @@ def _fit_params(
 
     for f in files:
         source = _source_from(f)
-        df = pd.read_parquet(f)
-        for in_col, _ in _resolve_column_pairs(df, columns_spec):
-            vals = df[in_col].dropna().astype(float).values
+        # Resolve columns from the schema alone, then decode only those
+        empty = pq.read_schema(f).empty_table().to_pandas()
+        in_cols = list(dict.fromkeys(c for c, _ in _resolve_column_pairs(empty, columns_spec)))
+        if not in_cols:
+            continue
+        table = pq.read_table(f, columns=in_cols)
+        for in_col in in_cols:
+            vals = table.column(in_col).to_numpy(zero_copy_only=False).astype(float)
+            vals = vals[~np.isnan(vals)]
             if len(vals):
                 raw[source][in_col].append(vals)
 
@@ -157,11 +164,14 @@ def _apply(df: pd.DataFrame, source_params: dict, columns_spec, clip: bool) -> p
         lo, hi = source_params[in_col]["p2"], source_params[in_col]["p98"]
         denom = hi - lo
         if denom == 0:
-            normalized = pd.Series(0.0, index=df.index)
+            normalized = np.zeros(len(df))
         else:
-            normalized = (df[in_col].astype(float) - lo) / denom
+            # Work on a private float64 buffer: one subtract, divide and clip pass
+            normalized = df[in_col].to_numpy(dtype=float, na_value=np.nan, copy=True)
+            normalized -= lo
+            normalized /= denom
         if clip:
-            normalized = normalized.clip(0.0, 1.0)
+            np.clip(normalized, 0.0, 1.0, out=normalized)
         df[out_col] = normalized
     return df
 
@@ -237,6 +247,13 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
             )
         df = pd.read_parquet(f)
         df = _apply(df, norm_params[source], columns, clip)
-        df.to_parquet(out_domain / f.name, index=True)
+        df.to_parquet(
+            out_domain / f.name,
+            index=True,
+            compression="zstd",
+            compression_level=1,
+            use_dictionary=True,
+            write_statistics=True,
+        )
 
     print(f"  [normalize] Applied to {len(files)} files ({domain})")
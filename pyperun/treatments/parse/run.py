@@ -1,7 +1,8 @@
-import re
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from pyperun.core.filename import FileParts, build_parquet_path, parse_raw_stem
 
@@ -113,17 +114,35 @@ def parse_kv_csv(csv_file: Path, delimiter: str, ts_col: str, tz: str) -> pd.Dat
         return pd.DataFrame()
 
     df = pd.DataFrame(rows)
-    df["ts"] = pd.to_datetime(df["ts"], format="mixed", utc=(tz == "UTC"))
+    df["ts"] = parse_ts(df["ts"], tz)
     return df
 
 
+def parse_ts(values: pd.Series, tz: str) -> pd.Series:
+    """Parse timestamp strings; UTC output goes through Arrow's C++ ISO 8601 cast.
+
+    Strings Arrow rejects (no zone offset, non-ISO layouts) fall back to
+    pd.to_datetime(format="mixed"), which also handles non-UTC tz settings.
+    """
+    if tz == "UTC":
+        try:
+            parsed = pc.cast(pa.array(values, type=pa.string()), pa.timestamp("ns", "UTC"))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        else:
+            return pd.Series(parsed.to_pandas(), index=values.index, name=values.name)
+    return pd.to_datetime(values, format="mixed", utc=(tz == "UTC"))
+
+
 def resolve_columns(all_cols: list[str], domain_spec: dict) -> list[str]:
     if "columns" in domain_spec:
-        return [c for c in domain_spec["columns"] if c in all_cols]
+        available = set(all_cols)
+        return [c for c in domain_spec["columns"] if c in available]
     if "prefix" in domain_spec:
         prefix = domain_spec["prefix"]
+        n = len(prefix)
         return sorted(
-            [c for c in all_cols if re.match(rf"^{re.escape(prefix)}\d+$", c)],
-            key=lambda c: int(c[len(prefix):]),
+            [c for c in all_cols if c.startswith(prefix) and c[n:].isdecimal()],
+            key=lambda c: int(c[n:]),
         )
     return []
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
 import fnmatch
-import io
+import os
 import re
+import struct
+import sys
+import threading
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from itertools import product
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import psycopg2
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 
 from pyperun.core.filename import list_parquet_files, parse_parquet_path
 
@@ -20,18 +32,42 @@ _PG_TYPE_MAP = {
     "int64": "BIGINT",
 }
 
+# information_schema.columns.data_type -> the spelling used in _PG_TYPE_MAP
+_PG_CATALOG_TYPES = {
+    "timestamp with time zone": "TIMESTAMPTZ",
+    "bigint": "BIGINT",
+    "double precision": "DOUBLE PRECISION",
+    "text": "TEXT",
+}
+
+# COPY ... (FORMAT binary) framing: signature, flags, header-extension length / file trailer
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
+# 2000-01-01T00:00:00Z (the Postgres timestamp epoch) in Unix microseconds
+_PG_EPOCH_US = 946_684_800_000_000
+# Rows encoded per write into the COPY pipe
+_COPY_CHUNK_ROWS = 50_000
+# fnmatch metacharacters; filter parts without them are compared literally
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
 
 def _pg_type(dtype) -> str:
     key = str(dtype)
-    if key in _PG_TYPE_MAP:
-        return _PG_TYPE_MAP[key]
-    if "datetime" in key:
-        return "TIMESTAMPTZ"
-    if "int" in key.lower():
-        return "BIGINT"
-    if "float" in key.lower():
-        return "DOUBLE PRECISION"
-    return "TEXT"
+    pg = _PG_TYPE_MAP.get(key)
+    if pg is None:
+        # Unlisted dtypes (other units/tz, 32-bit widths, ...) are classified once
+        # and memoised so later columns of the same dtype are a single lookup.
+        lowered = key.lower()
+        if isinstance(dtype, pd.DatetimeTZDtype) or "datetime" in lowered:
+            pg = "TIMESTAMPTZ"
+        elif "int" in lowered:
+            pg = "BIGINT"
+        elif "float" in lowered:
+            pg = "DOUBLE PRECISION"
+        else:
+            pg = "TEXT"
+        _PG_TYPE_MAP[key] = pg
+    return pg
 
 
 def _sanitize(name: str) -> str:
@@ -51,34 +87,63 @@ def _render_table_name(template: str, parts: dict) -> str:
     return _sanitize(rendered).upper()
 
 
-def _resolve_allowed_columns(source: dict) -> list[str] | set | None:
+def _resolve_allowed_columns(source: dict) -> list[str] | frozenset | None:
     if "columns" in source:
         return source["columns"]
-    sensors = source.get("sensors")
-    transforms = source.get("transforms")
-    metrics = source.get("metrics")
+    return _structured_allowed(
+        tuple(source.get("sensors") or ()),
+        tuple(source.get("transforms") or ()),
+        tuple(source.get("metrics") or ()),
+    )
+
+
+@lru_cache(maxsize=None)
+def _structured_allowed(sensors: tuple, transforms: tuple, metrics: tuple) -> frozenset | None:
+    """(sensor, transform, metric) pattern triples; None on an axis means any value."""
     if not any([sensors, transforms, metrics]):
         return None
-    parts_lists = [sensors or [None], transforms or [None], metrics or [None]]
-    allowed = set()
-    for combo in product(*parts_lists):
-        allowed.add(tuple(combo))
-    return allowed
+    return frozenset(product(sensors or (None,), transforms or (None,), metrics or (None,)))
+
+
+def _is_literal(part: str | None) -> bool:
+    return part is not None and "__" not in part and not _GLOB_CHARS.search(part)
+
+
+def _structured_mask(names: list[str], allowed) -> np.ndarray:
+    """Boolean mask of *names* matching any (sensor, transform, metric) pattern in *allowed*."""
+    names = np.asarray(names, dtype=object)
+    mask = np.zeros(len(names), dtype=bool)
+    if not len(names):
+        return mask
+
+    # Fully literal triples are plain string membership: one isin over all names
+    literal = [p for p in allowed if all(_is_literal(x) for x in p)]
+    if literal:
+        mask |= np.isin(names, ["__".join(p) for p in literal])
+    patterns = [p for p in allowed if not all(_is_literal(x) for x in p)]
+    if not patterns:
+        return mask
+
+    # Split every name once; non-triples become empty rows that never match
+    split = [n.split("__") for n in names]
+    is_triple = np.fromiter((len(p) == 3 for p in split), dtype=bool, count=len(split))
+    parts = np.array([p if len(p) == 3 else ["", "", ""] for p in split], dtype=object)
+    for pattern in patterns:
+        hit = is_triple.copy()
+        for axis, pat in enumerate(pattern):
+            if pat is None:
+                continue
+            values = parts[:, axis]
+            if _GLOB_CHARS.search(pat):
+                hit &= np.isin(values, fnmatch.filter(set(values), pat))
+            else:
+                hit &= values == pat
+        mask |= hit
+    return mask
 
 
 def _matches_structured_filter(col: str, allowed) -> bool:
-    parts = col.split("__")
-    if len(parts) != 3:
-        return False
-    sensor, transform, metric = parts
-    for pattern in allowed:
-        if (
-            (pattern[0] is None or fnmatch.fnmatch(sensor, pattern[0]))
-            and (pattern[1] is None or fnmatch.fnmatch(transform, pattern[1]))
-            and (pattern[2] is None or fnmatch.fnmatch(metric, pattern[2]))
-        ):
-            return True
-    return False
+    return bool(_structured_mask([col], allowed)[0])
 
 
 def _find_source(sources: list[dict], domain: str, device_id: str) -> dict | None:
@@ -92,48 +157,178 @@ def _find_source(sources: list[dict], domain: str, device_id: str) -> dict | Non
     return None
 
 
-def _pivot_wide(files: list[Path], sources: list[dict]) -> pd.DataFrame:
-    """Read parquet files, prefix columns with device_id, merge on ts (outer join)."""
-    frames = []
+def _kept_columns(schema: pa.Schema, source: dict) -> list[str]:
+    """Data columns of *schema* selected by *source* (ts and pandas index columns excluded)."""
+    index_cols = set((schema.pandas_metadata or {}).get("index_columns", []))
+    data_cols = [c for c in schema.names if c != "ts" and c not in index_cols]
 
-    for f in files:
-        parts = parse_parquet_path(f)
-        source = _find_source(sources, parts.domain, parts.device_id)
-        if source is None:
-            continue
+    allowed = _resolve_allowed_columns(source)
+    if allowed is not None:
+        if isinstance(allowed, list):
+            allowed_set = set(allowed)
+            data_cols = [c for c in data_cols if c in allowed_set]
+        else:
+            data_cols = [c for c, keep in zip(data_cols, _structured_mask(data_cols, allowed)) if keep]
+    return data_cols
 
-        df = pd.read_parquet(f)
-        if df.empty:
-            continue
 
-        allowed = _resolve_allowed_columns(source)
-        data_cols = [c for c in df.columns if c != "ts"]
+def _prefixed(table: pa.Table, device_id: str, data_cols: list[str]) -> pa.Table | None:
+    if table.num_rows == 0:
+        return None
+    device_prefix = _sanitize(device_id)
+    return table.rename_columns(["ts"] + [f"{device_prefix}__{c}" for c in data_cols])
 
-        if allowed is not None:
-            if isinstance(allowed, list):
-                data_cols = [c for c in data_cols if c in allowed]
-            else:
-                data_cols = [c for c in data_cols if _matches_structured_filter(c, allowed)]
 
-        if not data_cols:
+def _read_one(path: Path, device_id: str, data_cols: list[str]) -> pa.Table | None:
+    """Read the kept columns of one file as an Arrow table, prefixed with device_id."""
+    table = pq.read_table(path, columns=["ts"] + data_cols, pre_buffer=True)
+    return _prefixed(table, device_id, data_cols)
+
+
+def _read_day(jobs: list[tuple[Path, str, list[str]]], schemas: list[pa.Schema]) -> list[pa.Table]:
+    """Read a day's files in one multi-threaded dataset scan, split back per file.
+
+    The scan runs in Arrow's C++ thread pool over the unified schema, projected to
+    the union of kept columns; batches are regrouped by their source fragment.
+    """
+    try:
+        schema = pa.unify_schemas(schemas).remove_metadata()
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Same column typed differently across files: read them one by one
+        with ThreadPoolExecutor(max_workers=min(32, len(jobs))) as pool:
+            return [t for t in pool.map(lambda job: _read_one(*job), jobs) if t is not None]
+
+    columns = list(dict.fromkeys(["ts"] + [c for _, _, cols in jobs for c in cols]))
+    dataset = ds.dataset([str(path) for path, _, _ in jobs], schema=schema, format="parquet")
+    batches = defaultdict(list)
+    for tagged in dataset.scanner(columns=columns, use_threads=True).scan_batches():
+        batches[tagged.fragment.path].append(tagged.record_batch)
+
+    scanned = pa.schema([schema.field(c) for c in columns])
+    tables = []
+    for fragment, (_, device_id, data_cols) in zip(dataset.get_fragments(), jobs):
+        table = pa.Table.from_batches(batches[fragment.path], schema=scanned)
+        table = _prefixed(table.select(["ts"] + data_cols), device_id, data_cols)
+        if table is not None:
+            tables.append(table)
+    return tables
+
+
+def _pivot_wide(files: list[Path], sources: list[dict], column_types: dict | None = None) -> pd.DataFrame:
+    """Read parquet files, prefix columns with device_id, merge on ts (outer join).
+
+    The day's files are scanned together as one Arrow dataset (C++ threads, no
+    GIL), projected and renamed per file, then aligned on the union of ts values.
+    *column_types* ({column: type} of the target table) is passed to _to_pandas.
+    """
+    jobs = []
+    schemas = []
+    for f in files:
+        parts = parse_parquet_path(f)
+        source = _find_source(sources, parts.domain, parts.device_id)
+        if source is None:
             continue
+        schema = pq.read_schema(f)
+        data_cols = _kept_columns(schema, source)
+        if data_cols:
+            jobs.append((f, parts.device_id, data_cols))
+            schemas.append(schema)
 
-        device_prefix = _sanitize(parts.device_id)
-        rename_map = {c: f"{device_prefix}__{c}" for c in data_cols}
-        df = df[["ts"] + data_cols].rename(columns=rename_map)
-        frames.append(df)
+    if not jobs:
+        return pd.DataFrame()
 
-    if not frames:
+    tables = _read_day(jobs, schemas)
+    if not tables:
         return pd.DataFrame()
 
-    result = frames[0]
-    for other in frames[1:]:
-        result = result.merge(other, on="ts", how="outer")
+    names = [c for t in tables for c in t.column_names[1:]]
+    ts_type = tables[0].schema.field("ts").type
+    unique_ts = all(
+        t.schema.field("ts").type == ts_type
+        and t["ts"].null_count == 0
+        and pc.count_distinct(t["ts"]).as_py() == t.num_rows
+        for t in tables
+    )
+    if len(set(names)) == len(names) and unique_ts:
+        return _to_pandas(_align_on_ts(tables, ts_type), column_types)
+
+    # Duplicate ts or column names: keep join semantics (all matches, _x/_y suffixes)
+    result = tables[0]
+    for other in tables[1:]:
+        result = result.join(
+            other, keys="ts", join_type="full outer", left_suffix="_x", right_suffix="_y",
+        )
+    return _to_pandas(result.sort_by("ts"), column_types)
+
+
+def _align_on_ts(tables: list[pa.Table], ts_type: pa.DataType) -> pa.Table:
+    """Outer-align tables with unique ts values on the sorted union of their ts.
+
+    Each file's rows are placed with one searchsorted into the union and every
+    column is gathered with a single take (null where the file has no row), so
+    the wide table is assembled column by column and converted to pandas once.
+    """
+    stamps = [t["ts"].to_numpy() for t in tables]
+    union = np.unique(np.concatenate(stamps))
+    columns = {"ts": pa.array(union, type=ts_type)}
+    for table, ts in zip(tables, stamps):
+        rows = np.full(len(union), -1, dtype=np.int64)
+        rows[np.searchsorted(union, ts)] = np.arange(len(ts))
+        indices = pa.array(rows, mask=rows < 0)
+        for name in table.column_names[1:]:
+            columns[name] = table[name].take(indices)
+    return pa.table(columns)
+
+
+def _to_pandas(table: pa.Table, column_types: dict | None = None) -> pd.DataFrame:
+    """Convert to pandas, int64 columns as nullable Int64 (created as BIGINT).
+
+    Integer columns the table already holds with another type, e.g. DOUBLE PRECISION
+    from an outer join with gaps, stay float64 so the table schema does not change.
+    """
+    if column_types:
+        for i, field in enumerate(table.schema):
+            if pa.types.is_integer(field.type) and column_types.get(field.name, "BIGINT") != "BIGINT":
+                table = table.set_column(i, field.name, table[field.name].cast(pa.float64()))
+    return table.to_pandas(
+        types_mapper={pa.int64(): pd.Int64Dtype()}.get,
+        self_destruct=True,
+        split_blocks=True,
+    )
 
-    return result.sort_values("ts").reset_index(drop=True)
 
+def _existing_columns(conn, table_name: str) -> dict[str, str]:
+    """Column name -> type of *table_name* (empty if the table does not exist)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = %s",
+            (table_name,),
+        )
+        return {
+            name: _PG_CATALOG_TYPES.get(data_type, data_type.upper())
+            for name, data_type in cur.fetchall()
+        }
+
+
+def _ensure_table(conn, table_name: str, df: pd.DataFrame, known: dict | None = None) -> list[str]:
+    """Create the table or add the columns of *df* it lacks; return the added columns.
+
+    The table's columns are read from information_schema once and cached in *known*
+    (table name -> {column: type} on this connection), so later frames whose columns
+    are all known send nothing. Otherwise CREATE TABLE IF NOT EXISTS and ALTER TABLE
+    ... ADD COLUMN IF NOT EXISTS go out as a single statement batch. Columns of a
+    newly created table are not reported as added.
+    """
+    if known is not None and table_name in known:
+        existing = known[table_name]
+    else:
+        existing = _existing_columns(conn, table_name)
+    missing = [col for col in df.columns if col not in existing]
+    if not missing:
+        if known is not None:
+            known[table_name] = existing
+        return []
 
-def _ensure_table(conn, table_name: str, df: pd.DataFrame) -> None:
     cols = []
     for col in df.columns:
         if col == "ts":
@@ -141,47 +336,250 @@ def _ensure_table(conn, table_name: str, df: pd.DataFrame) -> None:
         else:
             cols.append(f'"{col}" {_pg_type(df[col].dtype)}')
     sql = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(cols)})'
+    added = [col for col in missing if col != "ts"]
+    if added:
+        clauses = ", ".join(
+            f'ADD COLUMN IF NOT EXISTS "{col}" {_pg_type(df[col].dtype)}' for col in added
+        )
+        sql += f'; ALTER TABLE "{table_name}" {clauses}'
     with conn.cursor() as cur:
         cur.execute(sql)
     conn.commit()
 
+    if known is not None:
+        created = {col: "TIMESTAMPTZ" if col == "ts" else _pg_type(df[col].dtype) for col in missing}
+        known[table_name] = {**existing, **created}
+    return added if existing else []
+
+
+def _binary_column(series: pd.Series, pg: str | None = None) -> tuple[np.ndarray, np.ndarray] | None:
+    """Big-endian 8-byte values and NULL mask for one column, or None if not binary-encodable.
+
+    *pg* is the target column's type (default: the type a table created from this
+    series would have). Binary COPY does not check values against the column type,
+    so values are encoded as that type: tz-aware TIMESTAMPTZ (microseconds since
+    2000-01-01), integers as BIGINT, integers or floats as DOUBLE PRECISION (NaN ->
+    NULL). Any other pairing, such as floats into BIGINT, returns None.
+    """
+    source = _pg_type(series.dtype)
+    pg = pg or source
+    if pg == "TIMESTAMPTZ":
+        if not isinstance(series.dtype, pd.DatetimeTZDtype):
+            return None
+        us = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy("datetime64[us]")
+        null = np.isnat(us)
+        return (us.view("i8") - _PG_EPOCH_US).astype(">i8"), null
+    if pg == "BIGINT":
+        if source != "BIGINT":
+            return None
+        null = series.isna().to_numpy()
+        return series.to_numpy(dtype="int64", na_value=0).astype(">i8"), null
+    if pg == "DOUBLE PRECISION":
+        if source not in ("BIGINT", "DOUBLE PRECISION"):
+            return None
+        vals = series.to_numpy(dtype="float64", na_value=np.nan)
+        return vals.astype(">f8"), np.isnan(vals)
+    return None
 
-def _ensure_columns(conn, table_name: str, df: pd.DataFrame) -> list[str]:
-    with conn.cursor() as cur:
-        cur.execute(
-            "SELECT column_name FROM information_schema.columns WHERE table_name = %s",
-            (table_name,),
-        )
-        existing = {row[0] for row in cur.fetchall()}
 
-    added = []
+def _binary_rows(df: pd.DataFrame, column_types: dict | None = None) -> bytes | None:
+    """Encode the rows of *df* as COPY binary tuples, or None if a column needs CSV.
+
+    *column_types* maps column names to the target table's types (see _binary_column).
+
+    Rows are laid out as a fixed-width (n, 2 + 12 * ncols) byte matrix filled one
+    column at a time; the 8 value bytes of NULL cells are then masked out.
+    """
+    encoded = []
     for col in df.columns:
-        if col not in existing:
-            with conn.cursor() as cur:
-                cur.execute(
-                    f'ALTER TABLE "{table_name}" ADD COLUMN "{col}" {_pg_type(df[col].dtype)}'
-                )
-            added.append(col)
+        enc = _binary_column(df[col], column_types.get(col) if column_types else None)
+        if enc is None:
+            return None
+        encoded.append(enc)
+
+    n = len(df)
+    row_size = 2 + 12 * len(encoded)
+    rows = np.empty((n, row_size), dtype=np.uint8)
+    keep = np.ones((n, row_size), dtype=bool)
+    rows[:, :2] = np.frombuffer(struct.pack("!h", len(encoded)), dtype=np.uint8)
+    for j, (vals, null) in enumerate(encoded):
+        off = 2 + 12 * j
+        lengths = np.where(null, -1, 8).astype(">i4")
+        rows[:, off:off + 4] = lengths.view(np.uint8).reshape(n, 4)
+        rows[:, off + 4:off + 12] = vals.view(np.uint8).reshape(n, 8)
+        keep[null, off + 4:off + 12] = False
+
+    body = rows if keep.all() else rows[keep]
+    return body.tobytes()
+
+
+def _binary_copy_chunks(
+    df: pd.DataFrame, chunk_rows: int = _COPY_CHUNK_ROWS, column_types: dict | None = None,
+) -> Iterator[bytes] | None:
+    """COPY binary payload of *df* in row chunks, or None if a column needs CSV."""
+    first = _binary_rows(df.iloc[:chunk_rows], column_types)
+    if first is None:
+        return None
 
-    if added:
-        conn.commit()
-    return added
+    def _chunks():
+        yield _PGCOPY_HEADER
+        yield first
+        for start in range(chunk_rows, len(df), chunk_rows):
+            yield _binary_rows(df.iloc[start:start + chunk_rows], column_types)
+        yield _PGCOPY_TRAILER
+
+    return _chunks()
+
+
+def _encode_binary_copy(df: pd.DataFrame, column_types: dict | None = None) -> bytes | None:
+    """Whole COPY binary payload of *df*, or None if a column needs the CSV path."""
+    chunks = _binary_copy_chunks(df, column_types=column_types)
+    return None if chunks is None else b"".join(chunks)
+
+
+def _csv_copy_chunks(df: pd.DataFrame, chunk_rows: int = _COPY_CHUNK_ROWS) -> Iterator[bytes]:
+    """COPY CSV payload of *df* in row chunks, formatted by Arrow's C++ CSV writer.
 
+    Nulls (and float NaN) are written as empty unquoted fields, i.e. NULL '';
+    frames Arrow cannot convert fall back to pandas to_csv.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            yield chunk.to_csv(index=False, header=False, na_rep="").encode("utf-8")
+        return
+
+    options = pacsv.WriteOptions(include_header=False, delimiter=",")
+    for start in range(0, table.num_rows, chunk_rows):
+        sink = pa.BufferOutputStream()
+        pacsv.write_csv(table.slice(start, chunk_rows), sink, write_options=options)
+        yield sink.getvalue().to_pybytes()
+
+
+def _stream_copy(cur, sql: str, chunks: Iterable[bytes]) -> None:
+    """Run a COPY ... FROM STDIN fed through an OS pipe by a writer thread.
+
+    libpq drains the pipe while the next chunk is encoded, so peak memory is one
+    chunk rather than the whole payload. A writer error is re-raised after the
+    COPY so the caller never commits a truncated load. psycopg 3 cursors take the
+    same chunks through cursor.copy() instead.
+    """
+    psycopg3 = sys.modules.get("psycopg")  # only imported when selected as the driver
+    if psycopg3 is not None and isinstance(cur, psycopg3.Cursor):
+        # psycopg 3 takes the COPY data directly from this thread, no pipe needed
+        with cur.copy(sql) as copy:
+            for chunk in chunks:
+                copy.write(chunk)
+        return
+
+    r, w = os.pipe()
+    errors = []
+
+    def _writer():
+        try:
+            with os.fdopen(w, "wb") as sink:
+                for chunk in chunks:
+                    sink.write(chunk)
+        except BrokenPipeError:
+            pass  # the reader stopped early: copy_expert has already failed
+        except BaseException as exc:
+            errors.append(exc)
+
+    writer = threading.Thread(target=_writer, name="to_postgres-copy", daemon=True)
+    writer.start()
+    try:
+        with os.fdopen(r, "rb") as source:
+            cur.copy_expert(sql, source)
+    finally:
+        writer.join()
+    if errors:
+        raise errors[0]
 
-def _copy_to_postgres(conn, table_name: str, df: pd.DataFrame) -> int:
+
+def _copy_to_postgres(
+    conn, table_name: str, df: pd.DataFrame, commit: bool = True, column_types: dict | None = None,
+) -> int:
+    """COPY *df* into the table; *column_types* ({column: type}) picks the binary encoding."""
     if df.empty:
         return 0
-    buf = io.StringIO()
-    df.to_csv(buf, index=False, header=False, na_rep="")
-    buf.seek(0)
     columns = ", ".join(f'"{c}"' for c in df.columns)
+    chunks = _binary_copy_chunks(df, column_types=column_types)
+    if chunks is not None:
+        sql = f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT binary)'
+    else:
+        chunks = _csv_copy_chunks(df)
+        sql = f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\')'
+    with conn.cursor() as cur:
+        _stream_copy(cur, sql, chunks)
+    if commit:
+        conn.commit()
+    return len(df)
+
+
+def _replace_rows(conn, table_name: str, df: pd.DataFrame, column_types: dict | None = None) -> int:
+    """Delete the table rows in df's ts range, then COPY df in."""
+    ts_min = df["ts"].min()
+    ts_max = df["ts"].max()
+
     with conn.cursor() as cur:
-        cur.copy_expert(
-            f'COPY "{table_name}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\')',
-            buf,
+        cur.execute(
+            f'DELETE FROM "{table_name}" WHERE ts >= %s AND ts <= %s',
+            (ts_min, ts_max),
         )
     conn.commit()
-    return len(df)
+    return _copy_to_postgres(conn, table_name, df, column_types=column_types)
+
+
+def _get_max_ts(conn, table_name: str):
+    with conn.cursor() as cur:
+        cur.execute(f'SELECT MAX(ts) FROM "{table_name}"')
+        return cur.fetchone()[0]
+
+
+def _append_rows(conn, table_name: str, df: pd.DataFrame, column_types: dict | None = None) -> int:
+    """Insert only the rows of *df* whose ts is not already in the table.
+
+    When every row is newer than the table's max ts the frame is COPYed straight
+    in. Otherwise it is COPYed into a temporary staging table and merged
+    server-side with INSERT ... ON CONFLICT (ts) DO NOTHING, in one transaction.
+    The staging table is private to this session and dropped at commit, so
+    concurrent runs never share it and its name stays short whatever the table's.
+    """
+    max_ts = _get_max_ts(conn, table_name)
+    if max_ts is None or df["ts"].min() > max_ts:
+        return _copy_to_postgres(conn, table_name, df, column_types=column_types)
+
+    staging = "pyperun_staging"
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f'CREATE TEMP TABLE "{staging}" (LIKE "{table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+            )
+        # The staging table is LIKE the real one, so it has the same column types
+        _copy_to_postgres(conn, staging, df, commit=False, column_types=column_types)
+        with conn.cursor() as cur:
+            cur.execute(
+                f'INSERT INTO "{table_name}" ({columns}) '
+                f'SELECT {columns} FROM "{staging}" ON CONFLICT (ts) DO NOTHING'
+            )
+            inserted = cur.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return inserted
+
+
+def _connect(params: dict, driver: str):
+    kwargs = {k: params[k] for k in ("host", "port", "dbname", "user", "password")}
+    if driver == "psycopg":
+        import psycopg  # optional: pip install pyperun[psycopg]
+
+        return psycopg.connect(**kwargs)
+    return psycopg2.connect(**kwargs)
 
 
 def run(input_dir: str, output_dir: str, params: dict) -> None:
@@ -190,6 +588,12 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
     table_prefix = params.get("table_prefix", "")
     table_template = params["table_template"]
     aggregations = params.get("aggregations", [])
+    mode = params.get("mode", "replace")
+    if mode not in ("replace", "append"):
+        raise ValueError(f"Unknown to_postgres mode: {mode!r} (expected 'replace' or 'append')")
+    driver = params.get("driver", "psycopg2")
+    if driver not in ("psycopg2", "psycopg"):
+        raise ValueError(f"Unknown to_postgres driver: {driver!r} (expected 'psycopg2' or 'psycopg')")
 
     parquet_files = list_parquet_files(in_path)
     if not parquet_files:
@@ -204,16 +608,13 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
         group_key = (parts.experience, parts.step, parts.aggregation)
         groups[group_key][parts.day].append(pf)
 
-    conn = psycopg2.connect(
-        host=params["host"],
-        port=params["port"],
-        dbname=params["dbname"],
-        user=params["user"],
-        password=params["password"],
-    )
+    conn = _connect(params, driver)
 
     total_rows = 0
     total_days = 0
+    # Table schemas seen on this connection; scoped to the run so tables
+    # dropped or altered between runs are always re-checked.
+    known_columns: dict[str, dict[str, str]] = {}
 
     try:
         for (experience, step, aggregation), days in sorted(groups.items()):
@@ -226,29 +627,24 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
             )
 
             print(f"  [to_postgres] Table: {table_name} ({len(days)} days)")
+            if table_name not in known_columns:
+                known_columns[table_name] = _existing_columns(conn, table_name)
 
             for day in sorted(days):
                 day_files = days[day]
-                df = _pivot_wide(day_files, sources)
+                df = _pivot_wide(day_files, sources, known_columns[table_name])
                 if df.empty:
                     continue
 
-                _ensure_table(conn, table_name, df)
-                added = _ensure_columns(conn, table_name, df)
+                added = _ensure_table(conn, table_name, df, known_columns)
                 if added:
                     print(f"  [to_postgres]   added columns: {added}")
 
-                ts_min = df["ts"].min()
-                ts_max = df["ts"].max()
-
-                with conn.cursor() as cur:
-                    cur.execute(
-                        f'DELETE FROM "{table_name}" WHERE ts >= %s AND ts <= %s',
-                        (ts_min, ts_max),
-                    )
-                conn.commit()
-
-                rows = _copy_to_postgres(conn, table_name, df)
+                column_types = known_columns[table_name]
+                if mode == "append":
+                    rows = _append_rows(conn, table_name, df, column_types)
+                else:
+                    rows = _replace_rows(conn, table_name, df, column_types)
                 total_rows += rows
                 total_days += 1
 
@@ -1,3 +1,4 @@
+from functools import wraps
 from pathlib import Path
 
 import numpy as np
@@ -6,10 +7,52 @@ import pandas as pd
 from pyperun.core.filename import build_parquet_path, list_parquet_files, parse_parquet_path
 
 
+def _silent_fp(func):
+    """Run a transform with NumPy floating-point warnings off: NaN is its error value."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _on_positive(arr: np.ndarray, first, *rest) -> np.ndarray:
+    """Apply ufuncs in turn to the positive entries of *arr*; every other entry is NaN.
+
+    The first ufunc is masked with where= so zero, negative and NaN lanes are never
+    computed; they stay NaN in the output buffer, which the rest update in place.
+    """
+    out = np.full(arr.shape, np.nan)
+    first(arr, out=out, where=arr > 0)
+    for ufunc in rest:
+        ufunc(out, out=out)
+    return out
+
+
+@_silent_fp
+def _sqrt_inv(arr: np.ndarray) -> np.ndarray:
+    return _on_positive(arr, np.sqrt, np.reciprocal)
+
+
+@_silent_fp
+def _cbrt_inv(arr: np.ndarray) -> np.ndarray:
+    return _on_positive(arr, np.cbrt, np.reciprocal)
+
+
+@_silent_fp
+def _log(arr: np.ndarray) -> np.ndarray:
+    return _on_positive(arr, np.log)
+
+
+# Transforms map a float64 array (NaN for NA), 1-D or 2-D, to a new array of the
+# same shape. Each ufunc runs in place on one buffer with no per-element NA checks,
+# and run() applies a transform to all its target columns in a single call.
 TRANSFORMS = {
-    "sqrt_inv": lambda s: 1.0 / np.sqrt(s.where(s > 0, other=np.nan)),
-    "cbrt_inv": lambda s: 1.0 / np.cbrt(s.where(s > 0, other=np.nan)),
-    "log": lambda s: np.log(s.where(s > 0, other=np.nan)),
+    "sqrt_inv": _sqrt_inv,
+    "cbrt_inv": _cbrt_inv,
+    "log": _log,
 }
 
 
@@ -19,6 +62,22 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
     out_path.mkdir(parents=True, exist_ok=True)
 
     transforms = params["transforms"]
+    # Extra pyarrow writer options, e.g. {"compression": None, "write_statistics": False}
+    write_opts = params.get("parquet", {})
+
+    # Validate every spec, then compile them once into an immutable tuple of
+    # (callable, name, target, mode) that the per-file loop only iterates
+    for spec in transforms:
+        if spec["function"] not in TRANSFORMS:
+            raise ValueError(
+                f"Unknown transform function '{spec['function']}'. "
+                f"Available: {sorted(TRANSFORMS)}"
+            )
+    resolved = tuple(
+        (TRANSFORMS[spec["function"]], spec["function"], spec["target"], spec.get("mode", "add"))
+        for spec in transforms
+    )
+    reorder = any(mode == "add" for *_, mode in resolved)
 
     parquet_files = list_parquet_files(in_path)
     if not parquet_files:
@@ -35,51 +94,41 @@ def run(input_dir: str, output_dir: str, params: dict) -> None:
         df = pd.read_parquet(pf)
 
         if not transforms:
-            df.to_parquet(build_parquet_path(out_parts, out_path), index=False)
+            df.to_parquet(build_parquet_path(out_parts, out_path), index=False, **write_opts)
             stats["files"] += 1
             continue
 
         # Capture original columns before any transforms add new ones
         original_columns = df.columns.tolist()
 
-        for spec in transforms:
-            func_name = spec["function"]
-            if func_name not in TRANSFORMS:
-                raise ValueError(
-                    f"Unknown transform function '{func_name}'. "
-                    f"Available: {sorted(TRANSFORMS)}"
-                )
-
-            target_cols = _resolve_target(spec["target"], original_columns, parts.domain)
+        for func, func_name, target, mode in resolved:
+            target_cols = _resolve_target(target, original_columns, parts.domain)
             if not target_cols:
                 continue
 
-            mode = spec.get("mode", "add")
-            func = TRANSFORMS[func_name]
-
-            for col in target_cols:
-                transformed = func(df[col].astype("Float64")).astype("Float64")
+            values = df[target_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+            out = func(values)
 
-                if mode == "replace":
-                    df[col] = transformed
-                    stats["cols_replaced"] += 1
-                else:
-                    new_col = f"{col}__{func_name}"
-                    df[new_col] = transformed
-                    stats["cols_added"] += 1
+            if mode == "replace":
+                names = target_cols
+                stats["cols_replaced"] += len(names)
+            else:
+                names = [f"{col}__{func_name}" for col in target_cols]
+                stats["cols_added"] += len(names)
+            df[names] = pd.DataFrame(out, index=df.index, columns=names).astype("Float64")
 
-        if any(spec.get("mode", "add") == "add" for spec in transforms):
+        if reorder:
             df = _reorder_columns(df, transforms, parts.domain)
 
         stats["files"] += 1
-        df.to_parquet(build_parquet_path(out_parts, out_path), index=False)
+        df.to_parquet(build_parquet_path(out_parts, out_path), index=False, **write_opts)
 
     print(f"  [transform] {stats['files']} files, {stats['cols_added']} cols added, {stats['cols_replaced']} cols replaced")
 
 
 def _resolve_target(target: dict, columns: list | pd.Index, file_domain: str) -> list[str]:
-    col_set = set(columns)
     if "columns" in target:
+        col_set = set(columns)
         return [c for c in target["columns"] if c in col_set]
     if "domain" in target:
         if target["domain"] != file_domain:
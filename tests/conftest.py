@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from pyperun.core import runner as runner_mod
+
+
+class LogSink:
+    """Collects the pyperun log events emitted while a test runs, in memory."""
+
+    def __init__(self):
+        self.records: list[dict] = []
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "uses_log: test writes pyperun log events; redirect LOG_PATH into tmp_path",
+    )
+    config.addinivalue_line(
+        "markers", "benchmark: wall-time budget test; deselect with -m 'not benchmark'",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _iso_log(request, monkeypatch):
+    """Redirect pyperun.log into tmp_path for tests marked ``uses_log``."""
+    if request.node.get_closest_marker("uses_log") is None:
+        return None
+    path = request.getfixturevalue("tmp_path") / "pyperun.log"
+    monkeypatch.setattr("pyperun.core.logger.LOG_PATH", path)
+    return path
+
+
+@pytest.fixture
+def log_sink(monkeypatch):
+    """Capture log events as dicts instead of writing them to pyperun.log."""
+    sink = LogSink()
+    monkeypatch.setattr("pyperun.core.logger._write", sink.records.append)
+    return sink
+
+
+@pytest.fixture
+def patched_treatments_root(monkeypatch):
+    """Point the runner's treatment lookup at a test directory: ``patched_treatments_root(path)``."""
+    def _patch(path: Path) -> Path:
+        monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", path)
+        return path
+    return _patch
@@ -1,3 +1,5 @@
+import shutil
+
 import pandas as pd
 import pytest
 
@@ -13,25 +15,33 @@ def _make_aggregated_parquet(base_dir, device, day, data):
     df.to_parquet(domain_dir / filename, index=False)
 
 
-@pytest.fixture
-def sample_data(tmp_path):
-    """Create 2 days of fake aggregated data for 2 devices."""
+@pytest.fixture(scope="session")
+def _cached_sample_tree(tmp_path_factory):
+    """Build the sample parquet tree once; tests get their own copy."""
+    base = tmp_path_factory.mktemp("exportcsv_sample")
     ts_day1 = pd.date_range("2026-01-20 09:00:00", periods=6, freq="10s", tz="UTC")
     ts_day2 = pd.date_range("2026-01-21 08:00:00", periods=4, freq="10s", tz="UTC")
 
     for device in ["pil-90", "pil-98"]:
-        _make_aggregated_parquet(tmp_path / "input", device, "2026-01-20", {
+        _make_aggregated_parquet(base / "input", device, "2026-01-20", {
             "ts": ts_day1,
             "m0__raw__mean": [10.0, 11.0, 12.0, 13.0, 14.0, 15.0],
             "m1__raw__mean": [20.0, 21.0, 22.0, 23.0, 24.0, 25.0],
             "m2__raw__mean": [30.0, 31.0, 32.0, 33.0, 34.0, 35.0],
         })
-        _make_aggregated_parquet(tmp_path / "input", device, "2026-01-21", {
+        _make_aggregated_parquet(base / "input", device, "2026-01-21", {
             "ts": ts_day2,
             "m0__raw__mean": [100.0, 101.0, 102.0, 103.0],
             "m1__raw__mean": [200.0, 201.0, 202.0, 203.0],
             "m2__raw__mean": [300.0, 301.0, 302.0, 303.0],
         })
+    return base / "input"
+
+
+@pytest.fixture
+def sample_data(tmp_path, _cached_sample_tree):
+    """Create 2 days of fake aggregated data for 2 devices."""
+    shutil.copytree(_cached_sample_tree, tmp_path / "input")
     return tmp_path
 
 
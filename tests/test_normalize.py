@@ -1,4 +1,5 @@
 import json
+import shutil
 
 import numpy as np
 import pandas as pd
@@ -14,10 +15,10 @@ def _make_parquet(base_dir, source, domain, day, data):
     pd.DataFrame(data).to_parquet(domain_dir / filename, index=False)
 
 
-@pytest.fixture
-def sample_data(tmp_path):
-    """Two devices, two days, known values for deterministic percentile checks."""
-    inp = tmp_path / "input"
+@pytest.fixture(scope="session")
+def _cached_sample_tree(tmp_path_factory):
+    """Build the sample parquet tree once; tests get their own copy."""
+    inp = tmp_path_factory.mktemp("normalize_sample") / "input"
     for source in ["EXP_pil-90", "EXP_pil-98"]:
         _make_parquet(inp, source, "bio_signal", "2026-01-20", {
             "m0": list(range(0, 100)),    # 0..99
@@ -27,6 +28,13 @@ def sample_data(tmp_path):
             "m0": list(range(0, 100)),
             "m1": list(range(100, 200)),
         })
+    return inp
+
+
+@pytest.fixture
+def sample_data(tmp_path, _cached_sample_tree):
+    """Two devices, two days, known values for deterministic percentile checks."""
+    shutil.copytree(_cached_sample_tree, tmp_path / "input")
     return tmp_path
 
 
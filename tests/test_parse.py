@@ -3,7 +3,7 @@
 import pandas as pd
 import pytest
 
-from pyperun.treatments.parse.run import parse_file, resolve_columns, run
+from pyperun.treatments.parse.run import parse_file, parse_ts, resolve_columns, run
 
 
 @pytest.fixture
@@ -142,3 +142,18 @@ class TestResolveColumns:
     def test_no_mode_returns_empty(self):
         cols = resolve_columns(["ts", "m0"], {"dtype": "int"})
         assert cols == []
+
+
+class TestParseTs:
+    """Verify the Arrow fast path agrees with pandas and falls back cleanly."""
+
+    def test_utc_iso_matches_pandas(self):
+        values = pd.Series(["2026-01-20T10:00:00Z", "2026-01-20T10:00:01.250Z", "2026-01-20T12:00:00+02:00"])
+        expected = pd.to_datetime(values, format="mixed", utc=True)
+        pd.testing.assert_series_equal(parse_ts(values, "UTC"), expected)
+
+    def test_naive_strings_fall_back_to_pandas(self):
+        values = pd.Series(["2026-01-20 10:00:00", "2026-01-20 10:00:01"])
+        result = parse_ts(values, "UTC")
+        assert str(result.dtype) == "datetime64[ns, UTC]"
+        assert result.iloc[1] == pd.Timestamp("2026-01-20T10:00:01Z")
@@ -3,18 +3,18 @@ import os
 import tempfile
 from pathlib import Path
 
-import jsonlines
 import pytest
 
 from pyperun.core.runner import run_treatment
-from pyperun.core.logger import LOG_PATH
 
+pytestmark = pytest.mark.uses_log
 
-@pytest.fixture
-def tmp_treatment(tmp_path):
-    """Create a minimal temporary treatment for testing."""
-    treatment_dir = tmp_path / "treatments" / "echo"
-    treatment_dir.mkdir(parents=True)
+
+@pytest.fixture(scope="session")
+def tmp_treatment(tmp_path_factory):
+    """Create a minimal temporary treatment, shared read-only by all tests."""
+    treatment_dir = tmp_path_factory.mktemp("treatments") / "echo"
+    treatment_dir.mkdir()
 
     treatment_json = {
         "name": "echo",
@@ -24,7 +24,8 @@ def tmp_treatment(tmp_path):
             "count": {"type": "int", "default": 3},
         },
     }
-    (treatment_dir / "treatment.json").write_text(json.dumps(treatment_json))
+    with open(str(treatment_dir / "treatment.json"), "wb") as f:
+        f.write(json.dumps(treatment_json).encode("utf-8"))
 
     run_py = '''
 import json
@@ -34,26 +35,15 @@ def run(input_dir, output_dir, params):
     out = Path(output_dir) / "result.json"
     out.write_text(json.dumps(params, default=str))
 '''
-    (treatment_dir / "run.py").write_text(run_py)
+    with open(str(treatment_dir / "run.py"), "wb") as f:
+        f.write(run_py.encode("utf-8"))
 
     return treatment_dir
 
 
-@pytest.fixture(autouse=True)
-def clean_log():
-    """Remove pyperun.log before each test to isolate log assertions."""
-    if LOG_PATH.exists():
-        LOG_PATH.unlink()
-    yield
-    if LOG_PATH.exists():
-        LOG_PATH.unlink()
-
-
-def test_run_with_defaults(tmp_treatment, tmp_path, monkeypatch):
-    """run_treatment merges defaults correctly and the run function receives them."""
-    import pyperun.core.runner as runner_mod
-
-    monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_treatment.parent)
+def test_run_with_defaults(tmp_treatment, tmp_path, patched_treatments_root, log_sink):
+    """run_treatment merges defaults, passes them to run, and logs start + success."""
+    patched_treatments_root(tmp_treatment.parent)
 
     input_dir = tmp_path / "input"
     input_dir.mkdir()
@@ -64,13 +54,12 @@ def test_run_with_defaults(tmp_treatment, tmp_path, monkeypatch):
     result = json.loads((output_dir / "result.json").read_text())
     assert result["greeting"] == "hello"
     assert result["count"] == 3
+    assert {"start", "success"} <= {r["status"] for r in log_sink.records}
 
 
-def test_run_with_override(tmp_treatment, tmp_path, monkeypatch):
+def test_run_with_override(tmp_treatment, tmp_path, patched_treatments_root):
     """Provided params override defaults."""
-    import pyperun.core.runner as runner_mod
-
-    monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_treatment.parent)
+    patched_treatments_root(tmp_treatment.parent)
 
     input_dir = tmp_path / "input"
     input_dir.mkdir()
@@ -83,42 +72,30 @@ def test_run_with_override(tmp_treatment, tmp_path, monkeypatch):
     assert result["count"] == 7
 
 
-def test_log_contains_success(tmp_treatment, tmp_path, monkeypatch):
-    """pyperun.log should contain a success event after a run."""
-    import pyperun.core.runner as runner_mod
-
-    monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_treatment.parent)
+def test_creates_missing_output_dir(tmp_treatment, tmp_path, patched_treatments_root):
+    """run_treatment creates the output dir (and parents); callers never need to."""
+    patched_treatments_root(tmp_treatment.parent)
 
     input_dir = tmp_path / "input"
     input_dir.mkdir()
-    output_dir = tmp_path / "output"
+    output_dir = tmp_path / "nested" / "output"
 
     run_treatment("echo", str(input_dir), str(output_dir))
 
-    assert LOG_PATH.exists()
-    with jsonlines.open(LOG_PATH) as reader:
-        events = list(reader)
-
-    statuses = [e["status"] for e in events]
-    assert "start" in statuses
-    assert "success" in statuses
+    assert (output_dir / "result.json").is_file()
 
 
-def test_missing_input_dir(tmp_treatment, tmp_path, monkeypatch):
+def test_missing_input_dir(tmp_treatment, tmp_path, patched_treatments_root):
     """Should raise FileNotFoundError for non-existent input dir."""
-    import pyperun.core.runner as runner_mod
-
-    monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_treatment.parent)
+    patched_treatments_root(tmp_treatment.parent)
 
     with pytest.raises(FileNotFoundError):
         run_treatment("echo", str(tmp_path / "nonexistent"), str(tmp_path / "output"))
 
 
-def test_unknown_param(tmp_treatment, tmp_path, monkeypatch):
+def test_unknown_param(tmp_treatment, tmp_path, patched_treatments_root):
     """Should raise ValueError for unknown params."""
-    import pyperun.core.runner as runner_mod
-
-    monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_treatment.parent)
+    patched_treatments_root(tmp_treatment.parent)
 
     input_dir = tmp_path / "input"
     input_dir.mkdir()
@@ -1,11 +1,17 @@
 import json
 import os
 import time
+from dataclasses import dataclass
 from datetime import date, datetime, timezone, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
+import pyperun.core.timefilter as timefilter_mod
+from pyperun.core.runner import run_treatment
 from pyperun.core.timefilter import (
     extract_date_from_filename,
     filter_files_by_date_range,
@@ -30,6 +36,12 @@ class TestParseIsoUtc:
         assert dt.tzinfo == timezone.utc
         assert dt.hour == 12
 
+    def test_z_suffix_fast_path(self):
+        with patch("pyperun.core.timefilter.datetime", wraps=datetime) as dt:
+            result = parse_iso_utc("2026-01-25T10:30:05Z")
+        assert result == datetime(2026, 1, 25, 10, 30, 5, tzinfo=timezone.utc)
+        dt.fromisoformat.assert_not_called()
+
     def test_invalid_raises(self):
         with pytest.raises(ValueError):
             parse_iso_utc("not-a-date")
@@ -50,88 +62,123 @@ class TestExtractDate:
     def test_aggregated_with_window(self):
         assert extract_date_from_filename("PREMANIP-GRACE__pil-90__aggregated__60s__2026-01-25.parquet") == date(2026, 1, 25)
 
+    def test_repeated_name_is_cached(self):
+        extract_date_from_filename.cache_clear()
+        for _ in range(100):
+            extract_date_from_filename("EXP__dev__parsed__2026-01-25.parquet")
+        assert extract_date_from_filename.cache_info().hits == 99
+
+
 
 # --- filter_files_by_date_range ---
 
+ALL_NAMES = (
+    "domain=bio/EXP__dev__parsed__2026-01-24.parquet",
+    "domain=bio/EXP__dev__parsed__2026-01-25.parquet",
+    "domain=bio/EXP__dev__parsed__2026-01-26.parquet",
+    "domain=bio/EXP__dev__parsed__2026-01-27.parquet",
+    "readme.txt",
+)
+
+
+@pytest.fixture(scope="module")
+def all_files(tmp_path_factory):
+    """ALL_NAMES created once under a module-wide tmp dir."""
+    root = tmp_path_factory.mktemp("filter_files")
+    paths = [root / n for n in ALL_NAMES]
+    for parent in {p.parent for p in paths}:
+        parent.mkdir(parents=True, exist_ok=True)
+    for p in paths:
+        os.close(os.open(p, os.O_WRONLY | os.O_CREAT, 0o644))
+    return paths
+
+
 class TestFilterFiles:
-    def _make_files(self, tmp_path, names):
-        paths = []
-        for n in names:
-            p = tmp_path / n
-            p.parent.mkdir(parents=True, exist_ok=True)
-            p.touch()
-            paths.append(p)
-        return paths
-
-    def test_full_range(self, tmp_path):
-        files = self._make_files(tmp_path, [
-            "domain=bio/EXP__dev__parsed__2026-01-24.parquet",
-            "domain=bio/EXP__dev__parsed__2026-01-25.parquet",
-            "domain=bio/EXP__dev__parsed__2026-01-26.parquet",
-            "domain=bio/EXP__dev__parsed__2026-01-27.parquet",
-        ])
-        tf = datetime(2026, 1, 25, tzinfo=timezone.utc)
-        tt = datetime(2026, 1, 26, 23, 59, 59, tzinfo=timezone.utc)
-        result = filter_files_by_date_range(files, tf, tt)
+    @pytest.mark.parametrize("tf,tt,expected_days", [
+        (datetime(2026, 1, 25, tzinfo=timezone.utc),
+         datetime(2026, 1, 26, 23, 59, 59, tzinfo=timezone.utc),
+         ["2026-01-25", "2026-01-26"]),
+        (datetime(2026, 1, 26, tzinfo=timezone.utc), None, ["2026-01-26", "2026-01-27"]),
+        (None, datetime(2026, 1, 24, 23, 59, 59, tzinfo=timezone.utc), ["2026-01-24"]),
+        # no range: every dated file, files without a date are always excluded
+        (None, None, ["2026-01-24", "2026-01-25", "2026-01-26", "2026-01-27"]),
+    ], ids=["full_range", "from_only", "to_only", "no_range"])
+    def test_filter(self, all_files, tf, tt, expected_days):
+        result = filter_files_by_date_range(all_files, tf, tt)
         days = [f.name.split("__")[-1].replace(".parquet", "") for f in result]
-        assert "2026-01-25" in days
-        assert "2026-01-26" in days
-        assert len(result) == 2
-
-    def test_from_only(self, tmp_path):
-        files = self._make_files(tmp_path, [
-            "domain=bio/EXP__dev__parsed__2026-01-24.parquet",
-            "domain=bio/EXP__dev__parsed__2026-01-25.parquet",
-        ])
-        tf = datetime(2026, 1, 25, tzinfo=timezone.utc)
-        result = filter_files_by_date_range(files, tf, None)
-        assert len(result) == 1
-        assert "2026-01-25" in result[0].name
-
-    def test_to_only(self, tmp_path):
-        files = self._make_files(tmp_path, [
-            "domain=bio/EXP__dev__parsed__2026-01-25.parquet",
-            "domain=bio/EXP__dev__parsed__2026-01-26.parquet",
-        ])
-        tt = datetime(2026, 1, 25, 23, 59, 59, tzinfo=timezone.utc)
-        result = filter_files_by_date_range(files, None, tt)
-        assert len(result) == 1
-        assert "2026-01-25" in result[0].name
-
-    def test_no_date_in_filename_excluded(self, tmp_path):
-        files = self._make_files(tmp_path, [
-            "readme.txt",
-            "domain=bio/EXP__dev__parsed__2026-01-25.parquet",
-        ])
-        result = filter_files_by_date_range(files, None, None)
-        assert len(result) == 1
-
-    def test_no_range_returns_all_dated(self, tmp_path):
-        files = self._make_files(tmp_path, [
-            "domain=bio/EXP__dev__parsed__2026-01-24.parquet",
-            "domain=bio/EXP__dev__parsed__2026-01-25.parquet",
-        ])
-        result = filter_files_by_date_range(files, None, None)
-        assert len(result) == 2
+        assert days == expected_days
+
+    @pytest.mark.benchmark
+    def test_many_files_linear_time(self):
+        """Filtering 10x more files costs well under 100x (quadratic) the time."""
+        tf = datetime(2026, 1, 10, tzinfo=timezone.utc)
+        tt = datetime(2026, 1, 19, 23, 59, 59, tzinfo=timezone.utc)
+
+        def best_time(n):
+            # In-memory paths only: the filter never touches the filesystem
+            files = [Path(f"domain=bio/EXP__dev__parsed__2026-01-{d:02d}.parquet")
+                     for d in range(1, 29) for _ in range(n // 28)]
+            timings = []
+            for _ in range(3):
+                t0 = time.perf_counter()
+                result = filter_files_by_date_range(files, tf, tt)
+                timings.append(time.perf_counter() - t0)
+            assert len(result) == 10 * (n // 28)
+            return min(timings)
+
+        small, large = best_time(5_000), best_time(50_000)
+        # Linear scaling is ~10x; the generous bound only rejects quadratic behaviour
+        assert large < 30 * small + 0.05
+
+    def test_matches_scalar_path(self):
+        names = [f"EXP__dev__parsed__2026-{m:02d}-{d:02d}.parquet"
+                 for m in (1, 2, 3) for d in range(1, 29)]
+        names += [f"notes_{i}.txt" for i in range(50)]
+        files = [Path("domain=bio") / n for n in names]
+        tf = datetime(2026, 1, 20, 6, tzinfo=timezone.utc)
+        tt = datetime(2026, 2, 10, 18, tzinfo=timezone.utc)
+
+        for bounds in [(tf, tt), (tf, None), (None, tt), (None, None)]:
+            lo, hi = (b.date() if b else None for b in bounds)
+            expected = [
+                f for f in files
+                if (d := extract_date_from_filename(f.name)) is not None
+                and (lo is None or d >= lo) and (hi is None or d <= hi)
+            ]
+            assert filter_files_by_date_range(files, *bounds) == expected
 
 
 # --- resolve_last_range ---
 
 class TestResolveLastRange:
+    @pytest.fixture
+    def fake_parquet(self, monkeypatch):
+        """Create empty *.parquet files whose max timestamp is served from a dict."""
+        max_ts = {}
+        monkeypatch.setattr(timefilter_mod, "_read_max_timestamp", max_ts.get)
+
+        def _write(path, timestamps):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+            max_ts[path] = max(parse_iso_utc(t) for t in timestamps)
+
+        return _write
+
     def _write_parquet(self, path, timestamps):
         path.parent.mkdir(parents=True, exist_ok=True)
-        df = pd.DataFrame({
-            "timestamp": pd.to_datetime(timestamps, utc=True),
-            "value": range(len(timestamps)),
+        table = pa.table({
+            "timestamp": pa.array([parse_iso_utc(t) for t in timestamps],
+                                  type=pa.timestamp("ns", tz="UTC")),
+            "value": pa.array(range(len(timestamps)), type=pa.int64()),
         })
-        df.to_parquet(path, index=False)
+        pq.write_table(table, path)
 
-    def test_first_run_empty_output(self, tmp_path):
+    def test_first_run_empty_output(self, tmp_path, fake_parquet):
         inp = tmp_path / "input"
         out = tmp_path / "output"
         inp.mkdir()
         out.mkdir()
-        self._write_parquet(
+        fake_parquet(
             inp / "domain=bio" / "EXP__dev__parsed__2026-01-25.parquet",
             ["2026-01-25T10:00:00Z"],
         )
@@ -139,16 +186,16 @@ class TestResolveLastRange:
         assert tf is None
         assert tt is None
 
-    def test_up_to_date(self, tmp_path):
+    def test_up_to_date(self, tmp_path, fake_parquet):
         inp = tmp_path / "input"
         out = tmp_path / "output"
         inp.mkdir()
         out.mkdir()
-        self._write_parquet(
+        fake_parquet(
             inp / "domain=bio" / "EXP__dev__parsed__2026-01-25.parquet",
             ["2026-01-25T10:00:00Z"],
         )
-        self._write_parquet(
+        fake_parquet(
             out / "domain=bio" / "EXP__dev__clean__2026-01-25.parquet",
             ["2026-01-25T10:00:00Z"],
         )
@@ -156,6 +203,7 @@ class TestResolveLastRange:
             resolve_last_range(inp, out)
 
     def test_delta(self, tmp_path):
+        """Uses real parquet files so the timestamp decoding path stays covered."""
         inp = tmp_path / "input"
         out = tmp_path / "output"
         inp.mkdir()
@@ -173,16 +221,30 @@ class TestResolveLastRange:
         assert tf.minute == 0
         assert tt.hour == 14
 
-    def test_minimum_one_hour_window(self, tmp_path):
+    def test_reads_only_statistics(self, tmp_path, monkeypatch):
+        """The max timestamp comes from footer statistics; no column data is decoded."""
+        self._write_parquet(
+            tmp_path / "domain=bio" / "EXP__dev__parsed__2026-01-25.parquet",
+            ["2026-01-25T08:00:00Z", "2026-01-25T14:00:00Z"],
+        )
+        spy = MagicMock(wraps=pq.read_table)
+        monkeypatch.setattr(pq, "read_table", spy)
+
+        last = timefilter_mod.compute_last_timestamp(tmp_path)
+
+        assert last == datetime(2026, 1, 25, 14, tzinfo=timezone.utc)
+        spy.assert_not_called()
+
+    def test_minimum_one_hour_window(self, tmp_path, fake_parquet):
         inp = tmp_path / "input"
         out = tmp_path / "output"
         inp.mkdir()
         out.mkdir()
-        self._write_parquet(
+        fake_parquet(
             inp / "domain=bio" / "EXP__dev__parsed__2026-01-25.parquet",
             ["2026-01-25T10:30:00Z"],
         )
-        self._write_parquet(
+        fake_parquet(
             out / "domain=bio" / "EXP__dev__clean__2026-01-25.parquet",
             ["2026-01-25T10:00:00Z"],
         )
@@ -195,11 +257,12 @@ class TestResolveLastRange:
 class TestResolveLastRangeCsvInput:
     def _write_parquet(self, path, timestamps):
         path.parent.mkdir(parents=True, exist_ok=True)
-        df = pd.DataFrame({
-            "timestamp": pd.to_datetime(timestamps, utc=True),
-            "value": range(len(timestamps)),
+        table = pa.table({
+            "timestamp": pa.array([parse_iso_utc(t) for t in timestamps],
+                                  type=pa.timestamp("ns", tz="UTC")),
+            "value": pa.array(range(len(timestamps)), type=pa.int64()),
         })
-        df.to_parquet(path, index=False)
+        pq.write_table(table, path)
 
     def _write_csv(self, path, mtime=None):
         path.parent.mkdir(parents=True, exist_ok=True)
@@ -265,26 +328,7 @@ class TestResolveLastRangeCsvInput:
 
 # --- Integration: runner with --from/--to ---
 
-class TestRunnerTimeFilter:
-    def test_run_with_time_filter(self, tmp_path, monkeypatch):
-        """run_treatment with time_from/time_to only sees files in range."""
-        import pyperun.core.runner as runner_mod
-        from pyperun.core.runner import run_treatment
-        from pyperun.core.logger import LOG_PATH
-
-        if LOG_PATH.exists():
-            LOG_PATH.unlink()
-
-        # Create a treatment that lists input parquet files (in domain= subdirs)
-        treatment_dir = tmp_path / "treatments" / "lister"
-        treatment_dir.mkdir(parents=True)
-        treatment_json = {
-            "name": "lister",
-            "description": "Lists input parquet files",
-            "params": {},
-        }
-        (treatment_dir / "treatment.json").write_text(json.dumps(treatment_json))
-        run_py = '''
+LISTER_RUN_PY = '''
 import json
 from pathlib import Path
 
@@ -292,101 +336,72 @@ def run(input_dir, output_dir, params):
     files = sorted(f.name for f in Path(input_dir).rglob("*.parquet"))
     Path(output_dir).joinpath("files.json").write_text(json.dumps(files))
 '''
-        (treatment_dir / "run.py").write_text(run_py)
-
-        monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_path / "treatments")
-
-        # Create input with 3 days of parquet files in domain= subdirs
-        input_dir = tmp_path / "input"
-        for day in ["2026-01-24", "2026-01-25", "2026-01-26"]:
-            d = input_dir / "domain=bio"
-            d.mkdir(parents=True, exist_ok=True)
-            df = pd.DataFrame({"timestamp": [f"{day}T12:00:00Z"], "val": [1]})
-            df.to_parquet(d / f"EXP__dev__parsed__{day}.parquet", index=False)
-
-        output_dir = tmp_path / "output"
 
-        tf = datetime(2026, 1, 25, tzinfo=timezone.utc)
-        tt = datetime(2026, 1, 25, 23, 59, 59, tzinfo=timezone.utc)
-        run_treatment("lister", str(input_dir), str(output_dir),
-                      time_from=tf, time_to=tt)
 
-        result = json.loads((output_dir / "files.json").read_text())
-        assert result == ["EXP__dev__parsed__2026-01-25.parquet"]
+@dataclass
+class RunnerEnv:
+    input_dir: Path
+    output_dir: Path
+    treatments_root: Path
 
-        if LOG_PATH.exists():
-            LOG_PATH.unlink()
-
-    def test_replace_mode_scoped(self, tmp_path, monkeypatch):
-        """replace mode with time filter only deletes files in range (including subdirs)."""
-        import pyperun.core.runner as runner_mod
-        from pyperun.core.runner import run_treatment
-        from pyperun.core.logger import LOG_PATH
-
-        if LOG_PATH.exists():
-            LOG_PATH.unlink()
-
-        treatment_dir = tmp_path / "treatments" / "noop"
+    def install(self, name, run_py):
+        """Install a treatment called *name* whose run.py is *run_py*."""
+        treatment_dir = self.treatments_root / name
         treatment_dir.mkdir(parents=True)
-        (treatment_dir / "treatment.json").write_text(json.dumps({
-            "name": "noop", "description": "noop", "params": {},
-        }))
-        (treatment_dir / "run.py").write_text("def run(i, o, p): pass\n")
-
-        monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_path / "treatments")
-
-        input_dir = tmp_path / "input"
-        d_in = input_dir / "domain=bio"
-        d_in.mkdir(parents=True)
-        (d_in / "EXP__dev__parsed__2026-01-25.parquet").touch()
-
-        output_dir = tmp_path / "output"
-        d_out = output_dir / "domain=bio"
-        d_out.mkdir(parents=True)
-        (d_out / "EXP__dev__clean__2026-01-24.parquet").touch()
-        (d_out / "EXP__dev__clean__2026-01-25.parquet").touch()
-
-        tf = datetime(2026, 1, 25, tzinfo=timezone.utc)
-        tt = datetime(2026, 1, 25, 23, 59, 59, tzinfo=timezone.utc)
-        run_treatment("noop", str(input_dir), str(output_dir),
-                      time_from=tf, time_to=tt, output_mode="replace")
-
-        remaining = [f.name for f in output_dir.rglob("*.parquet")]
-        assert "EXP__dev__clean__2026-01-24.parquet" in remaining
-        assert "EXP__dev__clean__2026-01-25.parquet" not in remaining
-
-        if LOG_PATH.exists():
-            LOG_PATH.unlink()
-
-    def test_no_files_in_range_skips(self, tmp_path, monkeypatch):
-        """When --from is after all data, treatment is skipped without error."""
-        import pyperun.core.runner as runner_mod
-        from pyperun.core.runner import run_treatment
-        from pyperun.core.logger import LOG_PATH
-
-        if LOG_PATH.exists():
-            LOG_PATH.unlink()
-
-        treatment_dir = tmp_path / "treatments" / "noop"
-        treatment_dir.mkdir(parents=True)
-        (treatment_dir / "treatment.json").write_text(json.dumps({
-            "name": "noop", "description": "noop", "params": {},
-        }))
-        (treatment_dir / "run.py").write_text("def run(i, o, p): pass\n")
-
-        monkeypatch.setattr(runner_mod, "TREATMENTS_ROOT", tmp_path / "treatments")
-
-        input_dir = tmp_path / "input"
-        d = input_dir / "domain=bio"
-        d.mkdir(parents=True)
-        (d / "EXP__dev__parsed__2026-01-20.parquet").touch()
-
-        output_dir = tmp_path / "output"
+        treatment_json = {"name": name, "description": name, "params": {}}
+        with open(str(treatment_dir / "treatment.json"), "wb") as f:
+            f.write(json.dumps(treatment_json).encode("utf-8"))
+        with open(str(treatment_dir / "run.py"), "wb") as f:
+            f.write(run_py.encode("utf-8"))
+        return name
+
+
+@pytest.fixture
+def runner_env(tmp_path, patched_treatments_root):
+    env = RunnerEnv(tmp_path / "input", tmp_path / "output", tmp_path / "treatments")
+    patched_treatments_root(env.treatments_root)
+
+    # 3 days of input files in a domain= subdir; the runner only looks at names
+    d_in = env.input_dir / "domain=bio"
+    d_in.mkdir(parents=True)
+    for day in ["2026-01-24", "2026-01-25", "2026-01-26"]:
+        (d_in / f"EXP__dev__parsed__{day}.parquet").touch()
+
+    # Output already holds two days from a previous run
+    d_out = env.output_dir / "domain=bio"
+    d_out.mkdir(parents=True)
+    (d_out / "EXP__dev__clean__2026-01-24.parquet").touch()
+    (d_out / "EXP__dev__clean__2026-01-25.parquet").touch()
+    return env
+
+
+DAY_25 = (
+    datetime(2026, 1, 25, tzinfo=timezone.utc),
+    datetime(2026, 1, 25, 23, 59, 59, tzinfo=timezone.utc),
+)
+BOTH_CLEAN = ["EXP__dev__clean__2026-01-24.parquet", "EXP__dev__clean__2026-01-25.parquet"]
 
-        # --from after all data
-        tf = datetime(2026, 3, 1, tzinfo=timezone.utc)
-        run_treatment("noop", str(input_dir), str(output_dir), time_from=tf)
-        # Should not raise — just skip
 
-        if LOG_PATH.exists():
-            LOG_PATH.unlink()
+@pytest.mark.uses_log
+class TestRunnerTimeFilter:
+    @pytest.mark.parametrize("tf,tt,output_mode,expected_seen,expected_remaining", [
+        # time_from/time_to: the treatment only sees files in range
+        (*DAY_25, "append", ["EXP__dev__parsed__2026-01-25.parquet"], BOTH_CLEAN),
+        # replace mode with a time filter only deletes output files in range (incl. subdirs)
+        (*DAY_25, "replace", ["EXP__dev__parsed__2026-01-25.parquet"],
+         ["EXP__dev__clean__2026-01-24.parquet"]),
+        # --from after all data: the treatment is skipped without error
+        (datetime(2026, 3, 1, tzinfo=timezone.utc), None, "append", None, BOTH_CLEAN),
+    ], ids=["filter", "replace_scoped", "no_files_in_range_skips"])
+    def test_time_filter(self, runner_env, tf, tt, output_mode, expected_seen, expected_remaining):
+        name = runner_env.install("lister", LISTER_RUN_PY)
+        run_treatment(name, str(runner_env.input_dir), str(runner_env.output_dir),
+                      time_from=tf, time_to=tt, output_mode=output_mode)
+
+        files_json = runner_env.output_dir / "files.json"
+        if expected_seen is None:
+            assert not files_json.exists()
+        else:
+            assert json.loads(files_json.read_text()) == expected_seen
+        remaining = sorted(f.name for f in runner_env.output_dir.rglob("*.parquet"))
+        assert remaining == expected_remaining
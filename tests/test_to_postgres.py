@@ -1,21 +1,31 @@
 from __future__ import annotations
 
+import struct
+import sys
+from contextlib import contextmanager
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
+import pyarrow.dataset as ds
 import pytest
 
 from pyperun.treatments.to_postgres.run import (
+    _append_rows,
+    _binary_copy_chunks,
     _copy_to_postgres,
-    _ensure_columns,
+    _csv_copy_chunks,
+    _encode_binary_copy,
     _ensure_table,
     _get_max_ts,
     _matches_structured_filter,
     _pg_type,
     _pivot_wide,
     _render_table_name,
+    _replace_rows,
     _resolve_allowed_columns,
+    _structured_mask,
     run,
 )
 
@@ -122,6 +132,67 @@ class TestPivotWide:
         assert "pil_98__outdoor_temp__raw__mean" in df.columns
         assert "ts" in df.columns
 
+    def test_partial_overlap_aligned_on_ts(self, tmp_path):
+        """Devices with different ts sets are aligned on the sorted union of ts."""
+        f1 = _make_parquet(
+            tmp_path, "bio_signal", "EXP", "pil-90", "aggregated", "2026-01-25",
+            {"ts": ["2026-01-25T00:01:00Z", "2026-01-25T00:00:00Z"], "m0__raw__mean": [2.0, 1.0]},
+            aggregation="60s",
+        )
+        f2 = _make_parquet(
+            tmp_path, "bio_signal", "EXP", "pil-98", "aggregated", "2026-01-25",
+            {"ts": ["2026-01-25T00:02:00Z", "2026-01-25T00:01:00Z"], "m0__raw__mean": [4.0, 3.0]},
+            aggregation="60s",
+        )
+
+        df = _pivot_wide([f1, f2], [{"domain": "bio_signal"}])
+
+        assert df["ts"].is_monotonic_increasing
+        assert df["pil_90__m0__raw__mean"].tolist()[:2] == [1.0, 2.0]
+        assert pd.isna(df["pil_90__m0__raw__mean"].iloc[2])
+        assert pd.isna(df["pil_98__m0__raw__mean"].iloc[0])
+        assert df["pil_98__m0__raw__mean"].tolist()[1:] == [3.0, 4.0]
+
+    def test_partial_overlap_keeps_nullable_ints(self, tmp_path):
+        """Integer columns gaining gaps from the ts union become nullable Int64, not float."""
+        f1 = _make_parquet(
+            tmp_path, "bio_signal", "EXP", "pil-90", "aggregated", "2026-01-25",
+            {"ts": ["2026-01-25T00:00:00Z"], "m0__raw__count": [7]},
+            aggregation="60s",
+        )
+        f2 = _make_parquet(
+            tmp_path, "bio_signal", "EXP", "pil-98", "aggregated", "2026-01-25",
+            {"ts": ["2026-01-25T00:01:00Z"], "m0__raw__count": [9]},
+            aggregation="60s",
+        )
+
+        df = _pivot_wide([f1, f2], [{"domain": "bio_signal"}])
+
+        assert str(df["ts"].dtype) == "datetime64[ns, UTC]"
+        assert str(df["pil_90__m0__raw__count"].dtype) == "Int64"
+        assert df["pil_90__m0__raw__count"].tolist() == [7, pd.NA]
+        assert df["pil_98__m0__raw__count"].tolist() == [pd.NA, 9]
+
+    def test_ints_stay_float_for_existing_double_precision_columns(self, tmp_path):
+        """Integer columns the table holds as DOUBLE PRECISION keep float64; new or BIGINT ones are Int64."""
+        f1 = _make_parquet(
+            tmp_path, "bio_signal", "EXP", "pil-90", "aggregated", "2026-01-25",
+            {"ts": ["2026-01-25T00:00:00Z"], "m0__raw__count": [7], "m1__raw__count": [8], "m2__raw__count": [9]},
+            aggregation="60s",
+        )
+        column_types = {
+            "ts": "TIMESTAMPTZ",
+            "pil_90__m0__raw__count": "DOUBLE PRECISION",
+            "pil_90__m1__raw__count": "BIGINT",
+        }
+
+        df = _pivot_wide([f1], [{"domain": "bio_signal"}], column_types)
+
+        assert str(df["pil_90__m0__raw__count"].dtype) == "float64"
+        assert df["pil_90__m0__raw__count"].tolist() == [7.0]
+        assert str(df["pil_90__m1__raw__count"].dtype) == "Int64"
+        assert str(df["pil_90__m2__raw__count"].dtype) == "Int64"
+
     def test_column_filter(self, tmp_path):
         """Only selected columns are included when 'columns' is specified."""
         ts = ["2026-01-25T00:00:00Z"]
@@ -183,14 +254,21 @@ class TestDtypeMapping:
         import numpy as np
         assert _pg_type(np.dtype("float64")) == "DOUBLE PRECISION"
 
+    def test_non_utc_tz_and_narrow_widths(self):
+        import numpy as np
+        assert _pg_type(pd.DatetimeTZDtype(tz="Europe/Paris")) == "TIMESTAMPTZ"
+        assert _pg_type(np.dtype("int32")) == "BIGINT"
+        assert _pg_type(np.dtype("float32")) == "DOUBLE PRECISION"
+        assert _pg_type(np.dtype("object")) == "TEXT"
+
 
 # ---------------------------------------------------------------------------
-# Unit tests: SQL generation (_ensure_table, _ensure_columns)
+# Unit tests: SQL generation (_ensure_table)
 # ---------------------------------------------------------------------------
 
 class TestSQLGeneration:
     def test_ensure_table_sql(self):
-        """Verify the CREATE TABLE statement is correct."""
+        """Verify the CREATE TABLE and ADD COLUMN IF NOT EXISTS batch is correct."""
         df = pd.DataFrame({
             "ts": pd.to_datetime(["2026-01-25T00:00:00Z"], utc=True),
             "pil_90__m0__raw__mean": pd.array([1.0], dtype="Float64"),
@@ -201,41 +279,92 @@ class TestSQLGeneration:
         mock_cur = MagicMock()
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_cur.fetchall.return_value = []  # table does not exist yet
 
-        _ensure_table(mock_conn, "TEST_TABLE", df)
+        assert _ensure_table(mock_conn, "TEST_TABLE", df) == []
 
         sql = mock_cur.execute.call_args[0][0]
         assert 'CREATE TABLE IF NOT EXISTS "TEST_TABLE"' in sql
         assert "ts TIMESTAMPTZ PRIMARY KEY" in sql
-        assert "pil_90__m0__raw__mean DOUBLE PRECISION" in sql
-        assert "pil_90__m0__raw__min BIGINT" in sql
+        assert '"pil_90__m0__raw__mean" DOUBLE PRECISION' in sql
+        assert '"pil_90__m0__raw__min" BIGINT' in sql
+        assert 'ALTER TABLE "TEST_TABLE" ADD COLUMN IF NOT EXISTS "pil_90__m0__raw__mean"' in sql
 
-    def test_ensure_columns_adds_missing(self):
-        """Verify ALTER TABLE ADD COLUMN for new columns."""
+    def test_ensure_table_adds_missing_columns_in_one_statement(self):
+        """Only missing columns are added, by one CREATE + ALTER batch; they are reported."""
         df = pd.DataFrame({
             "ts": pd.to_datetime(["2026-01-25T00:00:00Z"], utc=True),
             "pil_90__m0__raw__mean": pd.array([1.0], dtype="Float64"),
             "pil_99__m0__raw__mean": pd.array([2.0], dtype="Float64"),
+            "pil_99__m0__raw__min": pd.array([1], dtype="Int64"),
         })
 
         mock_conn = MagicMock()
         mock_cur = MagicMock()
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_cur.fetchall.return_value = [
+            ("ts", "timestamp with time zone"), ("pil_90__m0__raw__mean", "double precision"),
+        ]
 
-        # Simulate existing columns: ts and pil_90__m0__raw__mean
-        mock_cur.fetchall.return_value = [("ts",), ("pil_90__m0__raw__mean",)]
+        added = _ensure_table(mock_conn, "TEST_TABLE", df)
+
+        assert added == ["pil_99__m0__raw__mean", "pil_99__m0__raw__min"]
+        sqls = [c[0][0] for c in mock_cur.execute.call_args_list]
+        assert len(sqls) == 2
+        assert "information_schema" in sqls[0]
+        create, alter = sqls[1].split("; ")
+        assert create.startswith('CREATE TABLE IF NOT EXISTS "TEST_TABLE"')
+        assert alter == (
+            'ALTER TABLE "TEST_TABLE" '
+            'ADD COLUMN IF NOT EXISTS "pil_99__m0__raw__mean" DOUBLE PRECISION, '
+            'ADD COLUMN IF NOT EXISTS "pil_99__m0__raw__min" BIGINT'
+        )
 
-        added = _ensure_columns(mock_conn, "TEST_TABLE", df)
+    def test_existing_columns_are_not_reported(self):
+        """Columns already in the table are neither altered nor reported as added."""
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z"], utc=True),
+            "pil_90__m0__raw__mean": pd.array([1.0], dtype="Float64"),
+        })
 
-        assert "pil_99__m0__raw__mean" in added
-        # Check ALTER TABLE was called
-        alter_calls = [
-            call for call in mock_cur.execute.call_args_list
-            if "ALTER TABLE" in str(call)
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_cur.fetchall.return_value = [
+            ("ts", "timestamp with time zone"), ("pil_90__m0__raw__mean", "double precision"),
         ]
-        assert len(alter_calls) == 1
-        assert "pil_99__m0__raw__mean" in str(alter_calls[0])
+
+        assert _ensure_table(mock_conn, "TEST_TABLE", df, {}) == []
+        assert mock_cur.execute.call_count == 1  # the information_schema lookup only
+
+    def test_known_columns_skip_schema_queries(self):
+        """The catalog is read once per table; later frames within known columns send nothing."""
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z"], utc=True),
+            "pil_90__m0__raw__mean": pd.array([1.0], dtype="Float64"),
+        })
+        wider = df.assign(pil_98__m0__raw__mean=pd.array([2.0], dtype="Float64"))
+
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_cur.fetchall.return_value = [("ts", "timestamp with time zone")]
+
+        known = {}
+        assert _ensure_table(mock_conn, "TEST_TABLE", df, known) == ["pil_90__m0__raw__mean"]
+        for _ in range(2):
+            assert _ensure_table(mock_conn, "TEST_TABLE", df, known) == []
+        sqls = [c[0][0] for c in mock_cur.execute.call_args_list]
+        assert len(sqls) == 2
+        assert sum("information_schema" in q for q in sqls) == 1
+        assert known["TEST_TABLE"] == {"ts": "TIMESTAMPTZ", "pil_90__m0__raw__mean": "DOUBLE PRECISION"}
+
+        assert _ensure_table(mock_conn, "TEST_TABLE", wider, known) == ["pil_98__m0__raw__mean"]
+        assert mock_cur.execute.call_count == 3
+        assert known["TEST_TABLE"].keys() == set(wider.columns)
 
 
 # ---------------------------------------------------------------------------
@@ -264,6 +393,87 @@ class TestGetMaxTs:
         assert result is None
 
 
+# ---------------------------------------------------------------------------
+# Unit tests: _append_rows with mock
+# ---------------------------------------------------------------------------
+
+class TestAppendRows:
+    def _mock_conn(self, max_ts):
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_cur.fetchone.return_value = (max_ts,)
+        mock_cur.rowcount = 1
+        return mock_conn, mock_cur
+
+    def _df(self):
+        return pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z", "2026-01-25T00:01:00Z"], utc=True),
+            "val": [1.0, 2.0],
+        })
+
+    def test_newer_rows_copy_directly(self):
+        mock_conn, mock_cur = self._mock_conn(pd.Timestamp("2026-01-24T23:59:00Z"))
+
+        assert _append_rows(mock_conn, "TEST", self._df()) == 2
+        assert 'COPY "TEST"' in mock_cur.copy_expert.call_args[0][0]
+        assert not any("staging" in str(c) for c in mock_cur.execute.call_args_list)
+
+    def test_overlap_goes_through_temp_staging(self):
+        mock_conn, mock_cur = self._mock_conn(pd.Timestamp("2026-01-25T00:00:00Z"))
+
+        assert _append_rows(mock_conn, "TEST", self._df()) == 1
+        sqls = [c[0][0] for c in mock_cur.execute.call_args_list]
+        assert any(
+            q == 'CREATE TEMP TABLE "pyperun_staging" (LIKE "TEST" INCLUDING DEFAULTS) ON COMMIT DROP'
+            for q in sqls
+        )
+        assert any("ON CONFLICT (ts) DO NOTHING" in q for q in sqls)
+        assert 'COPY "pyperun_staging"' in mock_cur.copy_expert.call_args[0][0]
+        assert not any("DROP TABLE" in q for q in sqls)
+        mock_conn.commit.assert_called_once()
+
+    def test_staging_name_independent_of_table_name(self):
+        """Long table names never push the staging name past the 63-char identifier limit."""
+        mock_conn, mock_cur = self._mock_conn(pd.Timestamp("2026-01-25T00:00:00Z"))
+
+        _append_rows(mock_conn, "T" * 63, self._df())
+        assert 'COPY "pyperun_staging"' in mock_cur.copy_expert.call_args[0][0]
+
+    def test_failed_merge_rolls_back(self):
+        mock_conn, mock_cur = self._mock_conn(pd.Timestamp("2026-01-25T00:00:00Z"))
+        mock_cur.copy_expert.side_effect = RuntimeError("copy failed")
+
+        with pytest.raises(RuntimeError, match="copy failed"):
+            _append_rows(mock_conn, "TEST", self._df())
+        mock_conn.rollback.assert_called_once()
+        mock_conn.commit.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Unit tests: _replace_rows with mock
+# ---------------------------------------------------------------------------
+
+class TestReplaceRows:
+    def test_deletes_ts_range_then_copies(self):
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z", "2026-01-25T00:01:00Z"], utc=True),
+            "val": [1.0, 2.0],
+        })
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert _replace_rows(mock_conn, "TEST", df) == 2
+
+        sql, args = mock_cur.execute.call_args[0]
+        assert sql == 'DELETE FROM "TEST" WHERE ts >= %s AND ts <= %s'
+        assert args == (df["ts"].min(), df["ts"].max())
+        assert 'COPY "TEST"' in mock_cur.copy_expert.call_args[0][0]
+
+
 # ---------------------------------------------------------------------------
 # Unit tests: _copy_to_postgres with mock
 # ---------------------------------------------------------------------------
@@ -285,7 +495,71 @@ class TestCopyToPostgres:
         mock_cur.copy_expert.assert_called_once()
         sql_arg = mock_cur.copy_expert.call_args[0][0]
         assert 'COPY "TEST"' in sql_arg
-        assert "FORMAT csv" in sql_arg
+        assert "FORMAT binary" in sql_arg
+
+    def test_copy_text_column_falls_back_to_csv(self):
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z"], utc=True),
+            "label": ["a"],
+        })
+
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        _copy_to_postgres(mock_conn, "TEST", df)
+        assert "FORMAT csv" in mock_cur.copy_expert.call_args[0][0]
+
+    def test_csv_chunks_nulls_are_empty_fields(self):
+        df = pd.DataFrame({
+            "label": ["a,b", None],
+            "val": [1.5, float("nan")],
+        })
+        payload = b"".join(_csv_copy_chunks(df, chunk_rows=1))
+        assert payload == b'"a,b",1.5\n,\n'
+
+    def test_copy_streams_through_pipe(self):
+        """copy_expert receives a readable stream carrying the full payload."""
+        df = pd.DataFrame({
+            "ts": pd.date_range("2026-01-25", periods=3, freq="min", tz="UTC"),
+            "val": [1.0, 2.0, 3.0],
+        })
+        received = []
+
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_cur.copy_expert.side_effect = lambda sql, f: received.append(f.read())
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        _copy_to_postgres(mock_conn, "TEST", df)
+        assert received == [_encode_binary_copy(df)]
+
+    def test_copy_writes_chunks_to_psycopg3_cursor(self, monkeypatch):
+        """A psycopg 3 cursor is fed through cursor.copy(), bypassing the pipe."""
+        class Cursor:
+            def __init__(self):
+                self.sql, self.written = None, []
+
+            @contextmanager
+            def copy(self, sql):
+                self.sql = sql
+                yield SimpleNamespace(write=self.written.append)
+
+        monkeypatch.setitem(sys.modules, "psycopg", SimpleNamespace(Cursor=Cursor))
+        df = pd.DataFrame({
+            "ts": pd.date_range("2026-01-25", periods=3, freq="min", tz="UTC"),
+            "val": [1.0, 2.0, 3.0],
+        })
+        cur = Cursor()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        assert _copy_to_postgres(mock_conn, "TEST", df) == 3
+        assert cur.sql.startswith('COPY "TEST"')
+        assert b"".join(cur.written) == _encode_binary_copy(df)
 
     def test_copy_empty_returns_zero(self):
         df = pd.DataFrame()
@@ -293,6 +567,94 @@ class TestCopyToPostgres:
         assert _copy_to_postgres(mock_conn, "TEST", df) == 0
 
 
+# ---------------------------------------------------------------------------
+# Unit tests: _encode_binary_copy
+# ---------------------------------------------------------------------------
+
+def _decode_binary_copy(payload: bytes) -> list[tuple]:
+    """Minimal COPY binary reader: one tuple of raw bytes (or None) per row."""
+    assert payload[:11] == b"PGCOPY\n\xff\r\n\x00"
+    pos = 19
+    rows = []
+    while True:
+        (ncols,) = struct.unpack_from("!h", payload, pos)
+        pos += 2
+        if ncols == -1:
+            break
+        row = []
+        for _ in range(ncols):
+            (length,) = struct.unpack_from("!i", payload, pos)
+            pos += 4
+            if length == -1:
+                row.append(None)
+            else:
+                row.append(payload[pos:pos + length])
+                pos += length
+        rows.append(tuple(row))
+    assert pos == len(payload)
+    return rows
+
+
+class TestEncodeBinaryCopy:
+    def test_int_column_into_double_precision_table_column(self):
+        """Int64 values headed for an existing float8 column are sent as float8 bytes."""
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z", "2026-01-25T00:01:00Z"], utc=True),
+            "i": pd.array([7, None], dtype="Int64"),
+        })
+        mock_conn = MagicMock()
+        mock_cur = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cur)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_cur.fetchall.return_value = [("ts", "timestamp with time zone"), ("i", "double precision")]
+
+        known = {}
+        _ensure_table(mock_conn, "TEST", df, known)
+        rows = _decode_binary_copy(_encode_binary_copy(df, known["TEST"]))
+
+        assert known["TEST"]["i"] == "DOUBLE PRECISION"
+        assert struct.unpack("!d", rows[0][1])[0] == 7.0
+        assert rows[1][1] is None
+
+    def test_float_column_into_bigint_table_column_needs_csv(self):
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2026-01-25T00:00:00Z"], utc=True),
+            "f": [7.0],
+        })
+        assert _encode_binary_copy(df, {"ts": "TIMESTAMPTZ", "f": "BIGINT"}) is None
+        assert _encode_binary_copy(df, {"ts": "TIMESTAMPTZ", "f": "INTEGER"}) is None
+
+
+    def test_values_and_nulls(self):
+        df = pd.DataFrame({
+            "ts": pd.to_datetime(["2000-01-01T00:00:01Z", "2026-01-25T00:00:00Z"], utc=True),
+            "f": [1.5, float("nan")],
+            "i": pd.array([None, 7], dtype="Int64"),
+        })
+
+        rows = _decode_binary_copy(_encode_binary_copy(df))
+
+        assert len(rows) == 2
+        assert struct.unpack("!q", rows[0][0])[0] == 1_000_000
+        assert struct.unpack("!d", rows[0][1])[0] == 1.5
+        assert rows[0][2] is None
+        assert rows[1][1] is None
+        assert struct.unpack("!q", rows[1][2])[0] == 7
+
+    def test_chunked_payload_matches_whole(self):
+        df = pd.DataFrame({
+            "ts": pd.date_range("2026-01-25", periods=5, freq="min", tz="UTC"),
+            "f": [1.0, float("nan"), 3.0, 4.0, 5.0],
+        })
+        chunked = b"".join(_binary_copy_chunks(df, chunk_rows=2))
+        assert chunked == _encode_binary_copy(df)
+        assert len(_decode_binary_copy(chunked)) == 5
+
+    def test_text_column_not_encodable(self):
+        df = pd.DataFrame({"label": ["a"]})
+        assert _encode_binary_copy(df) is None
+
+
 # ---------------------------------------------------------------------------
 # Unit tests: aggregation filter
 # ---------------------------------------------------------------------------
@@ -381,6 +743,13 @@ class TestStructuredColumnFilter:
         source = {"domain": "bio_signal"}
         assert _resolve_allowed_columns(source) is None
 
+    def test_resolve_structured_is_cached(self):
+        """Equal structured filters resolve to the same cached pattern set."""
+        a = _resolve_allowed_columns({"domain": "bio_signal", "sensors": ["m0", "m1"], "metrics": ["mean"]})
+        b = _resolve_allowed_columns({"domain": "environment", "sensors": ["m0", "m1"], "metrics": ["mean"]})
+        assert a is b
+        assert a == {("m0", None, "mean"), ("m1", None, "mean")}
+
     def test_structured_column_filter(self, tmp_path):
         """sensors/transforms/metrics generate the correct column filter."""
         ts = ["2026-01-25T00:00:00Z"]
@@ -425,6 +794,29 @@ class TestStructuredColumnFilter:
         assert "pil_90__m1__sqrt_inv__mean" in df.columns
         assert "pil_90__m0__raw__std" not in df.columns
 
+    def test_filtered_columns_are_not_read(self, tmp_path):
+        """Column filters are resolved against the schema and pushed into the parquet read."""
+        ts = ["2026-01-25T00:00:00Z"]
+        f1 = _make_parquet(
+            tmp_path, "bio_signal", "EXP", "pil-90", "aggregated", "2026-01-25",
+            {"ts": ts, "m0__raw__mean": [1.0], "m0__raw__std": [0.5], "m1__raw__mean": [2.0]},
+            aggregation="60s",
+        )
+
+        sources = [{"domain": "bio_signal", "sensors": ["m0"], "metrics": ["mean"]}]
+        datasets = []
+        real_dataset = ds.dataset
+
+        def spy_dataset(*args, **kwargs):
+            datasets.append(MagicMock(wraps=real_dataset(*args, **kwargs)))
+            return datasets[-1]
+
+        with patch("pyperun.treatments.to_postgres.run.ds.dataset", side_effect=spy_dataset):
+            df = _pivot_wide([f1], sources)
+
+        assert datasets[0].scanner.call_args.kwargs["columns"] == ["ts", "m0__raw__mean"]
+        assert list(df.columns) == ["ts", "pil_90__m0__raw__mean"]
+
     def test_matches_structured_filter_basic(self):
         """_matches_structured_filter works with full and partial patterns."""
         allowed = {("m0", "sqrt_inv", "mean")}
@@ -437,6 +829,15 @@ class TestStructuredColumnFilter:
         assert _matches_structured_filter("m5__sqrt_inv__mean", allowed_wild)
         assert not _matches_structured_filter("m0__raw__mean", allowed_wild)
 
+    def test_structured_mask_literal_and_glob(self):
+        """_structured_mask mixes literal membership and fnmatch patterns in one pass."""
+        names = ["m0__raw__mean", "m1__raw__mean", "m10__raw__std", "m2__sqrt_inv__std", "m0__mean"]
+        allowed = {("m0", "raw", "mean"), ("m1*", None, "std")}
+        mask = _structured_mask(names, allowed)
+        assert mask.tolist() == [True, False, True, False, False]
+        assert mask.tolist() == [_matches_structured_filter(n, allowed) for n in names]
+        assert _structured_mask([], allowed).tolist() == []
+
     def test_matches_non_triple_columns_excluded(self):
         """Columns that don't have 3 parts are excluded by structured filter."""
         allowed = {("m0", None, "mean")}
@@ -465,8 +866,6 @@ class TestRunMocked:
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
         # _get_max_ts returns None (fresh table)
         mock_cur.fetchone.return_value = (None,)
-        # _ensure_columns: no existing columns yet
-        mock_cur.fetchall.return_value = []
 
         output_dir = tmp_path / "output"
         run(
@@ -488,6 +887,35 @@ class TestRunMocked:
         mock_conn.close.assert_called_once()
 
 
+    def test_psycopg_driver_connects_with_psycopg3(self, monkeypatch, tmp_path):
+        """driver="psycopg" opens the connection with psycopg 3 instead of psycopg2."""
+        _make_parquet(
+            tmp_path / "input", "bio_signal", "EXP", "pil-90", "aggregated", "2026-01-25",
+            {"ts": ["2026-01-25T00:00:00Z"], "m0__raw__mean": [1.0]}, aggregation="60s",
+        )
+        psycopg3 = MagicMock(Cursor=type("Cursor", (), {}))
+        monkeypatch.setitem(sys.modules, "psycopg", psycopg3)
+        params = {
+            "host": "localhost", "port": 5432, "dbname": "test", "user": "test", "password": "",
+            "table_template": "{experience}_{step}_{aggregation}",
+            "driver": "psycopg",
+            "sources": [{"domain": "bio_signal"}],
+        }
+
+        with patch("pyperun.treatments.to_postgres.run.psycopg2") as mock_psycopg2:
+            run(str(tmp_path / "input"), str(tmp_path / "output"), params)
+
+        psycopg3.connect.assert_called_once_with(
+            host="localhost", port=5432, dbname="test", user="test", password="",
+        )
+        mock_psycopg2.connect.assert_not_called()
+        psycopg3.connect.return_value.close.assert_called_once()
+
+    def test_unknown_driver_rejected(self, tmp_path):
+        with pytest.raises(ValueError, match="driver"):
+            run(str(tmp_path), str(tmp_path / "output"), {"sources": [], "table_template": "", "driver": "pg8000"})
+
+
 # ---------------------------------------------------------------------------
 # Integration tests (require a running PostgreSQL, skip otherwise)
 # ---------------------------------------------------------------------------
@@ -1,27 +1,101 @@
 """Tests for the transform treatment."""
 
+import os
+import shutil
+import warnings
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.fs
+import pyarrow.parquet as pq
 import pytest
 
-from pyperun.treatments.transform.run import TRANSFORMS, _resolve_target, run
+from pyperun.treatments.transform.run import TRANSFORMS, _resolve_target, _silent_fp, run
+
+
+_TS = np.array(["2026-01-20T10:00:00", "2026-01-20T10:00:01"], dtype="datetime64[ns]")
+
+# One filesystem handle shared by all parquet IO in this module
+_FS = pa.fs.LocalFileSystem()
+
+# Outputs are read back once and discarded: skip compression and statistics
+_FAST_WRITE = {"compression": None, "write_statistics": False}
+
+_BIO_SCHEMA = pa.schema([("ts", pa.timestamp("ns")), ("m0", pa.float64()), ("m1", pa.float64())])
+_BIO_INT_SCHEMA = pa.schema([("ts", pa.timestamp("ns")), ("m0", pa.int64()), ("m1", pa.float64())])
+_ENV_SCHEMA = pa.schema([("ts", pa.timestamp("ns")), ("outdoor_temp", pa.float64())])
+
+
+def _batch(schema, **columns):
+    schema = pa.schema([schema.field(name) for name in columns])
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+# Canonical inputs, built as typed RecordBatches at import and written once
+# per session: name -> (domain, batch)
+GOLDEN = {
+    "bio_two_rows": ("bio_signal", _batch(_BIO_SCHEMA, ts=_TS[:2], m0=[4.0, 9.0], m1=[16.0, 25.0])),
+    "bio_m0_m1": ("bio_signal", _batch(_BIO_SCHEMA, ts=_TS[:1], m0=[4.0], m1=[9.0])),
+    "bio_int_null": ("bio_signal", _batch(_BIO_INT_SCHEMA, ts=_TS[:2], m0=[None, 16], m1=[4.0, None])),
+    "bio_m0": ("bio_signal", _batch(_BIO_SCHEMA, ts=_TS[:1], m0=[4.0])),
+    "env_temp": ("environment", _batch(_ENV_SCHEMA, ts=_TS[:1], outdoor_temp=[18.5])),
+}
+
+
+@pytest.fixture(scope="session")
+def _cached_golden(tmp_path_factory):
+    """Write each GOLDEN input once; tests get their own copy."""
+    base = tmp_path_factory.mktemp("transform_golden")
+    paths = {}
+    for name, (_, batch) in GOLDEN.items():
+        paths[name] = base / f"{name}.parquet"
+        with pq.ParquetWriter(
+            str(paths[name]), batch.schema, filesystem=_FS,
+            compression=None, use_dictionary=False, write_statistics=False,
+        ) as writer:
+            writer.write_batch(batch)
+    return paths
 
 
 @pytest.fixture
-def make_parquet(tmp_path):
-    """Create a parquet file with the expected naming convention."""
+def make_parquet(tmp_path, _cached_golden):
+    """Copy a GOLDEN input into the test's tree with the expected naming convention."""
 
-    def _make(domain, data, source="EXP__dev01", day="2026-01-20", step="clean"):
+    def _make(name, source="EXP__dev01", day="2026-01-20", step="clean"):
+        domain = GOLDEN[name][0]
         domain_dir = tmp_path / "input" / f"domain={domain}"
         domain_dir.mkdir(parents=True, exist_ok=True)
-        df = pd.DataFrame(data)
         path = domain_dir / f"{source}__{step}__{day}.parquet"
-        df.to_parquet(path, index=False)
+        shutil.copyfile(_cached_golden[name], path)
         return path
 
     return _make
 
 
+def _only_parquet(directory):
+    """First parquet file under *directory*; stops walking as soon as one is found."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(".parquet"):
+                return Path(root) / name
+    raise FileNotFoundError(f"No parquet file under {directory}")
+
+
+def _read(path, *columns):
+    """Values of only the requested columns, as {name: list}."""
+    return pq.read_table(str(path), columns=list(columns), filesystem=_FS).to_pydict()
+
+
+def _out_columns(directory):
+    """Output column names from the footer metadata, without reading any row group.
+
+    partitioning=None keeps the domain=... directories from adding a column.
+    """
+    return pq.ParquetDataset(str(directory), filesystem=_FS, partitioning=None).schema.names
+
+
 @pytest.fixture
 def output_dir(tmp_path):
     return tmp_path / "output"
@@ -29,94 +103,136 @@ def output_dir(tmp_path):
 
 class TestSqrtInv:
     def test_positive_values(self):
-        s = pd.array([4, 9, 16], dtype="Int64")
-        result = TRANSFORMS["sqrt_inv"](pd.Series(s))
-        expected = [1.0 / 2.0, 1.0 / 3.0, 1.0 / 4.0]
-        np.testing.assert_allclose(result.to_numpy(dtype=float), expected)
+        result = TRANSFORMS["sqrt_inv"](np.array([4.0, 9.0, 16.0]))
+        np.testing.assert_allclose(result, [1.0 / 2.0, 1.0 / 3.0, 1.0 / 4.0])
 
     def test_zero_gives_nan(self):
-        s = pd.array([0, 4], dtype="Int64")
-        result = TRANSFORMS["sqrt_inv"](pd.Series(s))
-        assert pd.isna(result.iloc[0])
-        assert result.iloc[1] == pytest.approx(0.5)
+        result = TRANSFORMS["sqrt_inv"](np.array([0.0, 4.0]))
+        np.testing.assert_allclose(result, [np.nan, 0.5])
 
     def test_na_gives_nan(self):
-        s = pd.array([pd.NA, 4], dtype="Int64")
-        result = TRANSFORMS["sqrt_inv"](pd.Series(s))
-        assert pd.isna(result.iloc[0])
-        assert result.iloc[1] == pytest.approx(0.5)
+        values = pd.array([pd.NA, 4], dtype="Float64").to_numpy(dtype=float, na_value=np.nan)
+        result = TRANSFORMS["sqrt_inv"](values)
+        np.testing.assert_allclose(result, [np.nan, 0.5])
+
+    def test_input_not_modified(self):
+        values = np.array([0.0, 4.0, np.nan])
+        result = TRANSFORMS["sqrt_inv"](values)
+        np.testing.assert_array_equal(values, [0.0, 4.0, np.nan])
+        np.testing.assert_allclose(result, [np.nan, 0.5, np.nan])
+
+    def test_2d_columns(self):
+        result = TRANSFORMS["sqrt_inv"](np.array([[4.0, 16.0], [9.0, 0.0]]))
+        np.testing.assert_allclose(result, [[0.5, 0.25], [1.0 / 3.0, np.nan]])
 
 
 class TestLog:
     def test_positive_values(self):
-        s = pd.array([1, np.e, np.e**2], dtype="Float64")
-        result = TRANSFORMS["log"](pd.Series(s))
-        np.testing.assert_allclose(result.to_numpy(dtype=float), [0.0, 1.0, 2.0])
+        result = TRANSFORMS["log"](np.array([1.0, np.e, np.e**2]))
+        np.testing.assert_allclose(result, [0.0, 1.0, 2.0])
 
     def test_zero_gives_nan(self):
-        s = pd.array([0.0, 1.0], dtype="Float64")
-        result = TRANSFORMS["log"](pd.Series(s))
-        assert pd.isna(result.iloc[0])
-        assert result.iloc[1] == pytest.approx(0.0)
+        result = TRANSFORMS["log"](np.array([0.0, 1.0]))
+        np.testing.assert_allclose(result, [np.nan, 0.0])
 
     def test_na_gives_nan(self):
-        s = pd.array([pd.NA, 1.0], dtype="Float64")
-        result = TRANSFORMS["log"](pd.Series(s))
-        assert pd.isna(result.iloc[0])
-        assert result.iloc[1] == pytest.approx(0.0)
+        values = pd.array([pd.NA, 1.0], dtype="Float64").to_numpy(dtype=float, na_value=np.nan)
+        result = TRANSFORMS["log"](values)
+        np.testing.assert_allclose(result, [np.nan, 0.0])
+
+
+class TestFloatingPointWarnings:
+    def test_raw_ufuncs_warn(self):
+        """Sanity check: unguarded, these inputs do raise under the error filter."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            with pytest.raises(RuntimeWarning):
+                np.log(np.array([0.0, -1.0]))
+
+    def test_silent_fp_suppresses_divide_and_invalid(self):
+        @_silent_fp
+        def kernel(arr):
+            return np.log(arr), 1.0 / arr, np.sqrt(arr)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            log, inv, sqrt = kernel(np.array([0.0, -1.0]))
+        np.testing.assert_array_equal(log, [-np.inf, np.nan])
+        np.testing.assert_array_equal(inv, [np.inf, -1.0])
+        np.testing.assert_array_equal(sqrt, [0.0, np.nan])
+
+    @pytest.mark.parametrize("name", sorted(TRANSFORMS))
+    def test_edge_values_do_not_warn(self, name):
+        """Zero, negative, NaN, infinite and denormal inputs never raise FP warnings."""
+        assert TRANSFORMS[name].__wrapped__ is not None
+        values = np.array([0.0, -1.0, np.nan, np.inf, -np.inf, 5e-324, 4.0])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = TRANSFORMS[name](values)
+        assert np.isnan(result[:3]).all()
+        assert np.isnan(result[4])
 
 
 class TestModeAdd:
     def test_suffixed_columns_created(self, make_parquet, output_dir):
-        make_parquet("bio_signal", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z", "2026-01-20T10:00:01Z"]),
-            "m0": pd.array([4, 9], dtype="Int64"),
-            "m1": pd.array([16, 25], dtype="Int64"),
-        })
-        params = {"transforms": [
+        make_parquet("bio_two_rows")
+        params = {"parquet": _FAST_WRITE, "transforms": [
             {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
         ]}
         run(str(make_parquet.__wrapped__  if hasattr(make_parquet, '__wrapped__') else (output_dir.parent / "input")), str(output_dir), params)
 
         pf = list(output_dir.rglob("*.parquet"))
         assert len(pf) == 1
-        df = pd.read_parquet(pf[0])
-        assert "m0__sqrt_inv" in df.columns
-        assert "m1__sqrt_inv" in df.columns
-        assert df["m0__sqrt_inv"].iloc[0] == pytest.approx(0.5)
+        values = _read(pf[0], "m0__sqrt_inv", "m1__sqrt_inv")
+        assert values["m0__sqrt_inv"][0] == pytest.approx(0.5)
+        assert values["m1__sqrt_inv"] == pytest.approx([1.0 / 4.0, 1.0 / 5.0])
 
     def test_interleaved_order(self, make_parquet, output_dir):
-        make_parquet("bio_signal", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z"]),
-            "m0": pd.array([4], dtype="Int64"),
-            "m1": pd.array([9], dtype="Int64"),
-        })
-        params = {"transforms": [
+        make_parquet("bio_m0_m1")
+        params = {"parquet": _FAST_WRITE, "transforms": [
             {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
         ]}
         run(str(output_dir.parent / "input"), str(output_dir), params)
 
-        df = pd.read_parquet(list(output_dir.rglob("*.parquet"))[0])
-        assert list(df.columns) == ["ts", "m0", "m0__sqrt_inv", "m1", "m1__sqrt_inv"]
+        assert _out_columns(output_dir) == ["ts", "m0", "m0__sqrt_inv", "m1", "m1__sqrt_inv"]
+
+    def test_int_column_nulls_stay_null(self, make_parquet, output_dir):
+        make_parquet("bio_int_null")
+        params = {"parquet": _FAST_WRITE, "transforms": [
+            {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
+        ]}
+        run(str(output_dir.parent / "input"), str(output_dir), params)
+
+        values = _read(_only_parquet(output_dir), "m0", "m0__sqrt_inv", "m1__sqrt_inv")
+        assert values["m0"] == [None, 16]
+        assert values["m0__sqrt_inv"] == [None, pytest.approx(0.25)]
+        assert values["m1__sqrt_inv"] == [pytest.approx(0.5), None]
 
 
 class TestModeReplace:
     def test_columns_replaced_inplace(self, make_parquet, output_dir):
-        make_parquet("bio_signal", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z"]),
-            "m0": pd.array([4], dtype="Int64"),
-            "m1": pd.array([9], dtype="Int64"),
-        })
-        params = {"transforms": [
+        make_parquet("bio_m0_m1")
+        params = {"parquet": _FAST_WRITE, "transforms": [
             {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "replace"},
         ]}
         run(str(output_dir.parent / "input"), str(output_dir), params)
 
-        df = pd.read_parquet(list(output_dir.rglob("*.parquet"))[0])
-        assert "m0__sqrt_inv" not in df.columns
-        assert list(df.columns) == ["ts", "m0", "m1"]
-        assert df["m0"].iloc[0] == pytest.approx(0.5)
-        assert df["m1"].iloc[0] == pytest.approx(1.0 / 3.0)
+        pf = _only_parquet(output_dir)
+        assert _out_columns(output_dir) == ["ts", "m0", "m1"]
+        values = _read(pf, "m0", "m1")
+        assert values["m0"][0] == pytest.approx(0.5)
+        assert values["m1"][0] == pytest.approx(1.0 / 3.0)
+
+    def test_int_column_nulls_stay_null(self, make_parquet, output_dir):
+        make_parquet("bio_int_null")
+        params = {"parquet": _FAST_WRITE, "transforms": [
+            {"function": "log", "target": {"columns": ["m0"]}, "mode": "replace"},
+        ]}
+        run(str(output_dir.parent / "input"), str(output_dir), params)
+
+        values = _read(_only_parquet(output_dir), "m0", "m1")
+        assert values["m0"] == [None, pytest.approx(np.log(16.0))]
+        assert values["m1"] == [4.0, None]
 
 
 class TestTargetDomain:
@@ -126,18 +242,15 @@ class TestTargetDomain:
         assert result == ["m0", "m1"]
 
     def test_non_matching_domain_passthrough(self, make_parquet, output_dir):
-        make_parquet("environment", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z"]),
-            "outdoor_temp": pd.array([18.5], dtype="Float64"),
-        })
-        params = {"transforms": [
+        make_parquet("env_temp")
+        params = {"parquet": _FAST_WRITE, "transforms": [
             {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
         ]}
         run(str(output_dir.parent / "input"), str(output_dir), params)
 
-        df = pd.read_parquet(list(output_dir.rglob("*.parquet"))[0])
-        assert list(df.columns) == ["ts", "outdoor_temp"]
-        assert df["outdoor_temp"].iloc[0] == pytest.approx(18.5)
+        pf = _only_parquet(output_dir)
+        assert _out_columns(output_dir) == ["ts", "outdoor_temp"]
+        assert _read(pf, "outdoor_temp")["outdoor_temp"][0] == pytest.approx(18.5)
 
 
 class TestTargetColumns:
@@ -154,46 +267,60 @@ class TestTargetColumns:
 
 class TestUnknownFunction:
     def test_raises_value_error(self, make_parquet, output_dir):
-        make_parquet("bio_signal", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z"]),
-            "m0": pd.array([4], dtype="Int64"),
-        })
+        make_parquet("bio_m0")
+        params = {"parquet": _FAST_WRITE, "transforms": [
+            {"function": "nonexistent", "target": {"domain": "bio_signal"}, "mode": "add"},
+        ]}
+        with pytest.raises(ValueError, match="Unknown transform function 'nonexistent'"):
+            run(str(output_dir.parent / "input"), str(output_dir), params)
+
+    def test_raises_before_writing(self, make_parquet, output_dir):
+        make_parquet("bio_m0")
         params = {"transforms": [
+            {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
             {"function": "nonexistent", "target": {"domain": "bio_signal"}, "mode": "add"},
         ]}
         with pytest.raises(ValueError, match="Unknown transform function 'nonexistent'"):
             run(str(output_dir.parent / "input"), str(output_dir), params)
+        assert not list(output_dir.rglob("*.parquet"))
 
 
 class TestEmptyTransforms:
     def test_passthrough(self, make_parquet, output_dir):
-        make_parquet("bio_signal", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z"]),
-            "m0": pd.array([4], dtype="Int64"),
-        })
-        params = {"transforms": []}
+        make_parquet("bio_m0")
+        params = {"parquet": _FAST_WRITE, "transforms": []}
         run(str(output_dir.parent / "input"), str(output_dir), params)
 
-        df = pd.read_parquet(list(output_dir.rglob("*.parquet"))[0])
-        assert list(df.columns) == ["ts", "m0"]
-        assert df["m0"].iloc[0] == 4
+        pf = _only_parquet(output_dir)
+        assert _out_columns(output_dir) == ["ts", "m0"]
+        assert _read(pf, "m0")["m0"][0] == 4
 
 
 class TestMultipleTransforms:
     def test_two_transforms_on_same_column(self, make_parquet, output_dir):
-        make_parquet("bio_signal", {
-            "ts": pd.to_datetime(["2026-01-20T10:00:00Z"]),
-            "m0": pd.array([4], dtype="Int64"),
-        })
-        params = {"transforms": [
+        make_parquet("bio_m0")
+        params = {"parquet": _FAST_WRITE, "transforms": [
             {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
             {"function": "log", "target": {"domain": "bio_signal"}, "mode": "add"},
         ]}
         run(str(output_dir.parent / "input"), str(output_dir), params)
 
-        df = pd.read_parquet(list(output_dir.rglob("*.parquet"))[0])
-        assert "m0__sqrt_inv" in df.columns
-        assert "m0__log" in df.columns
-        assert df["m0__sqrt_inv"].iloc[0] == pytest.approx(0.5)
-        assert df["m0__log"].iloc[0] == pytest.approx(np.log(4))
-        assert list(df.columns) == ["ts", "m0", "m0__sqrt_inv", "m0__log"]
+        pf = _only_parquet(output_dir)
+        assert _out_columns(output_dir) == ["ts", "m0", "m0__sqrt_inv", "m0__log"]
+        values = _read(pf, "m0__sqrt_inv", "m0__log")
+        assert values["m0__sqrt_inv"][0] == pytest.approx(0.5)
+        assert values["m0__log"][0] == pytest.approx(np.log(4))
+
+
+class TestParquetOptions:
+    def test_writer_options_applied(self, make_parquet, output_dir):
+        make_parquet("bio_m0")
+        params = {"parquet": _FAST_WRITE, "transforms": [
+            {"function": "sqrt_inv", "target": {"domain": "bio_signal"}, "mode": "add"},
+        ]}
+        run(str(output_dir.parent / "input"), str(output_dir), params)
+
+        metadata = pq.read_metadata(str(_only_parquet(output_dir)), filesystem=_FS)
+        column = metadata.row_group(0).column(1)
+        assert column.compression == "UNCOMPRESSED"
+        assert not column.is_stats_set